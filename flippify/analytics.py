@@ -0,0 +1,192 @@
+import argparse
+import json
+from datetime import datetime, timedelta
+
+
+# Metric calculations shared by the dashboard, the profit report and the
+# command line. Nothing here touches Tk, so it can be run, profiled and
+# tested without a display. The per-item metrics use NumPy through
+# item_snapshot, which is only imported when they are first asked for:
+#
+#     python analytics.py --db flippify.db --period Month
+
+# Length of each report period, counted back from today
+PERIOD_DAYS = {"Week": 7, "Month": 30, "Year": 365}
+PERIODS = ("All",) + tuple(PERIOD_DAYS)
+
+# Sold-price buckets for the price distribution; None means no upper bound
+PRICE_RANGES = (("₱0-100", 100), ("₱101-500", 500), ("₱501-1000", 1000), ("₱1001-2000", 2000), ("₱2000+", None))
+
+
+def period_start(period, today=None):
+    """First excluded day (YYYY-MM-DD) for a report period, or None for 'All'"""
+    days = PERIOD_DAYS.get(period)
+    if days is None:
+        return None
+    today = today or datetime.now()
+    return (today - timedelta(days=days)).strftime("%Y-%m-%d")
+
+
+def growth_rate(current, previous):
+    """Percentage change from previous to current; 0 when there is nothing to compare"""
+    return (current - previous) / previous * 100 if previous > 0 else 0
+
+
+def margin(profit, revenue):
+    """Profit as a percentage of revenue"""
+    return profit / revenue * 100 if revenue > 0 else 0
+
+
+def roi(profit, cost):
+    """Profit as a percentage of the amount invested"""
+    return profit / cost * 100 if cost > 0 else 0
+
+
+def period_summary(db, period="All", today=None):
+    """Count, revenue, cost, profit and margin of the sales in a report period"""
+    since = period_start(period, today)
+    if since is None:
+        totals = db.fetch_totals()
+        revenue, cost, count = totals["revenue"], totals["sold_cost"], totals["sold_count"]
+    else:
+        revenue, cost, count = db.sales_totals_since(since)
+    profit = revenue - cost
+    return {"period": period, "since": since, "count": count, "revenue": revenue, "cost": cost,
+            "profit": profit, "margin": margin(profit, revenue)}
+
+
+def kpis(db):
+    """All-time headline figures for the dashboard cards"""
+    totals = db.fetch_totals()
+    best = db.best_item()
+    return {
+        "item_count": totals["item_count"],
+        "sold_count": totals["sold_count"],
+        "revenue": totals["revenue"],
+        "profit": totals["profit"],
+        "margin": margin(totals["profit"], totals["revenue"]),
+        "avg_profit": totals["profit"] / totals["sold_count"] if totals["sold_count"] > 0 else 0,
+        "best_item": best[0] if best else None,
+    }
+
+
+def performance(db, today=None):
+    """This month and year against the previous ones"""
+    today = today or datetime.now()
+    year, month = today.year, today.month
+    prev_year, prev_month = (year - 1, 12) if month == 1 else (year, month - 1)
+
+    # Monthly (revenue, profit) totals for this year and last, from the rollups
+    monthly = {
+        y: {m: (revenue, profit) for m, revenue, profit, _ in db.sales_by_month(y)}
+        for y in (year, year - 1)
+    }
+
+    month_revenue, month_profit = monthly[year].get(month, (0, 0))
+    prev_month_revenue, _ = monthly[prev_year].get(prev_month, (0, 0))
+    year_revenue = sum(revenue for revenue, _ in monthly[year].values())
+    year_profit = sum(profit for _, profit in monthly[year].values())
+    prev_year_revenue = sum(revenue for revenue, _ in monthly[year - 1].values())
+
+    return {
+        "current_month": today.strftime("%B"),
+        "current_year": year,
+        "current_month_revenue": month_revenue,
+        "current_month_profit": month_profit,
+        "current_year_revenue": year_revenue,
+        "current_year_profit": year_profit,
+        "month_revenue_change": growth_rate(month_revenue, prev_month_revenue),
+        "year_revenue_change": growth_rate(year_revenue, prev_year_revenue),
+        "month_margin": margin(month_profit, month_revenue),
+    }
+
+
+def profit_analysis(db, year):
+    """Top items, the margin histogram, investment columns and the monthly trend for one year's sales"""
+    from item_snapshot import snapshot
+    snap = snapshot(db)
+    mask = snap.year_mask(year)
+    return {
+        "count": int(mask.sum()),
+        "top_profit": snap.rows(snap.top("profit", 10, mask)),
+        # (counts, edges), so the chart does not bin every sale again on the Tk thread
+        "margin_histogram": snap.histogram("margin", 15, mask),
+        "investments": snap.cost[mask],
+        "profits": snap.profit[mask],
+        "monthly_profit": snap.monthly_profit(mask),
+    }
+
+
+def item_performance(db, top_n=15, since=None):
+    """Best items by profit and ROI, price ranges and the sold/unsold split.
+
+    since limits the sales to those after a YYYY-MM-DD day; the sold/unsold
+    split always covers every item.
+    """
+    from item_snapshot import snapshot
+    snap = snapshot(db)
+    mask = snap.since_mask(since) if since else None
+    totals = db.fetch_totals()
+    return {
+        "count": len(snap) if mask is None else int(mask.sum()),
+        "top_profit": snap.rows(snap.top("profit", top_n, mask)),
+        "top_roi": snap.rows(snap.top("roi", top_n, mask)),
+        "price_ranges": snap.price_distribution(mask),
+        "sold_count": totals["sold_count"],
+        "unsold_count": totals["item_count"] - totals["sold_count"],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Print Flippify sales analytics without the GUI.")
+    parser.add_argument("--db", default="flippify.db", help="database file (default: flippify.db)")
+    parser.add_argument("--period", choices=PERIODS, default="All", help="report period (default: All)")
+    parser.add_argument("--top", type=int, default=10, help="number of top items to list (default: 10)")
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    args = parser.parse_args(argv)
+
+    from database import DatabaseManager
+    db = DatabaseManager(args.db)
+    try:
+        items = item_performance(db, args.top, since=period_start(args.period))
+        report = {
+            "summary": period_summary(db, args.period),
+            "kpis": kpis(db),
+            "performance": performance(db),
+            "top_profit": items["top_profit"],
+            "top_roi": items["top_roi"],
+            "price_distribution": dict(zip((label for label, _ in PRICE_RANGES), items["price_ranges"])),
+        }
+    finally:
+        db.close()
+
+    if args.json:
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+        return
+
+    summary = report["summary"]
+    print(f"Period: {summary['period']}" + (f" (after {summary['since']})" if summary["since"] else ""))
+    print(f"  Items sold: {summary['count']:,}")
+    print(f"  Revenue:    ₱{summary['revenue']:,.2f}")
+    print(f"  Cost:       ₱{summary['cost']:,.2f}")
+    print(f"  Profit:     ₱{summary['profit']:,.2f} ({summary['margin']:.1f}% margin)")
+
+    perf = report["performance"]
+    print(f"\n{perf['current_month']}: ₱{perf['current_month_revenue']:,.2f} "
+          f"({perf['month_revenue_change']:+.1f}% vs last month)")
+    print(f"{perf['current_year']}: ₱{perf['current_year_revenue']:,.2f} "
+          f"({perf['year_revenue_change']:+.1f}% vs last year)")
+
+    for title, key, column in (("Top items by profit", "top_profit", 3), ("Top items by ROI", "top_roi", 4)):
+        print(f"\n{title}:")
+        for item in report[key]:
+            value = f"₱{item[column]:,.2f}" if column == 3 else f"{item[column]:.1f}%"
+            print(f"  {item[0][:40]:<40} {value:>14}")
+
+    print("\nSales by price range:")
+    for label, count in report["price_distribution"].items():
+        print(f"  {label:<12} {count:,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,53 @@
 import tkinter as tk
 from tkinter import ttk
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from matplotlib.figure import Figure
 import matplotlib.pyplot as plt
 from database import DatabaseManager
+import analytics
+from tasks import TaskExecutor
 import numpy as np
-from calendar import monthrange
+
+
+# Built charts kept for instant redisplay; the least recently shown is dropped first
+CHART_CACHE_SIZE = 8
+
+
+class ChartCache:
+    """LRU cache of finished charts, keyed by (chart type, year, size, data generation).
+
+    Keying on the database generation means any write makes older entries
+    unreachable, so they age out instead of needing explicit invalidation.
+    """
+
+    def __init__(self, max_entries=CHART_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        chart = self._entries.get(key)
+        if chart is not None:
+            self._entries.move_to_end(key)
+        return chart
+
+    def put(self, key, chart):
+        self._entries[key] = chart
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
 
 
 class AnalyticsDashboard(ttk.Frame):
-    def __init__(self, parent):
+    # Shared by every dashboard instance, so switching tabs keeps the charts
+    chart_cache = ChartCache()
+
+    def __init__(self, parent, db=None, tasks=None):
         super().__init__(parent)
-        self.db = DatabaseManager()
+        self.db = db if db is not None else DatabaseManager()
+        self.tasks = tasks if tasks is not None else TaskExecutor(self)
+        self.chart_task = None
         self.configure(padding=0)
 
         # Configure matplotlib for dark theme
@@ -53,6 +89,10 @@ class AnalyticsDashboard(ttk.Frame):
         self.canvas.bind("<MouseWheel>", self._on_mousewheel)
         self.bind_all("<MouseWheel>", self._on_mousewheel)
 
+        self.build_dashboard_content()
+
+    def build_dashboard_content(self):
+        """Fill the scrollable area; refresh_dashboard calls this again to reload"""
         # Header section
         header_frame = ttk.Frame(self.scrollable_frame)
         header_frame.pack(fill="x", pady=(20, 30), padx=20)
@@ -90,6 +130,9 @@ class AnalyticsDashboard(ttk.Frame):
 
     def _on_mousewheel(self, event):
         """Handle mouse wheel scrolling"""
+        # The binding is global, so ignore the wheel while the tab is hidden
+        if not self.winfo_ismapped():
+            return
         self.canvas.yview_scroll(int(-1 * (event.delta / 120)), "units")
 
     def get_chart_size(self):
@@ -101,89 +144,14 @@ class AnalyticsDashboard(ttk.Frame):
 
             # Scale figure size based on available width
             base_width = available_width / 100  # Convert pixels to inches (roughly)
-            return min(base_width, 12), 8  # Max width of 12 inches
+            # Half-inch steps so small resizes reuse cached charts
+            return min(round(base_width * 2) / 2, 12), 8  # Max width of 12 inches
         except:
             return 10, 8  # Default fallback size
 
     def get_performance_data(self):
         """Calculate performance metrics for current month and year"""
-        current_date = datetime.now()
-        current_year = current_date.year
-        current_month = current_date.month
-
-        # Get current month data
-        current_month_start = datetime(current_year, current_month, 1)
-        current_month_end = datetime(current_year, current_month, monthrange(current_year, current_month)[1])
-
-        # Get previous month data for comparison
-        if current_month == 1:
-            prev_month = 12
-            prev_year = current_year - 1
-        else:
-            prev_month = current_month - 1
-            prev_year = current_year
-
-        prev_month_start = datetime(prev_year, prev_month, 1)
-        prev_month_end = datetime(prev_year, prev_month, monthrange(prev_year, prev_month)[1])
-
-        # Get all sales data
-        rows = self.db.cursor.execute(
-            "SELECT sold_price, source_price, date FROM items WHERE sold_price > 0"
-        ).fetchall()
-
-        current_month_revenue = 0
-        current_month_profit = 0
-        current_year_revenue = 0
-        current_year_profit = 0
-        prev_month_revenue = 0
-        prev_month_profit = 0
-        prev_year_revenue = 0
-        prev_year_profit = 0
-
-        for sold, source, date_str in rows:
-            try:
-                dt = datetime.strptime(date_str, "%Y-%m-%d")
-                profit = sold - source
-
-                # Current month
-                if current_month_start <= dt <= current_month_end:
-                    current_month_revenue += sold
-                    current_month_profit += profit
-
-                # Current year
-                if dt.year == current_year:
-                    current_year_revenue += sold
-                    current_year_profit += profit
-
-                # Previous month
-                if prev_month_start <= dt <= prev_month_end:
-                    prev_month_revenue += sold
-                    prev_month_profit += profit
-
-                # Previous year
-                if dt.year == current_year - 1:
-                    prev_year_revenue += sold
-                    prev_year_profit += profit
-
-            except:
-                continue
-
-        # Calculate percentage changes
-        month_revenue_change = ((
-                                            current_month_revenue - prev_month_revenue) / prev_month_revenue * 100) if prev_month_revenue > 0 else 0
-        year_revenue_change = ((
-                                           current_year_revenue - prev_year_revenue) / prev_year_revenue * 100) if prev_year_revenue > 0 else 0
-
-        return {
-            'current_month_revenue': current_month_revenue,
-            'current_month_profit': current_month_profit,
-            'current_year_revenue': current_year_revenue,
-            'current_year_profit': current_year_profit,
-            'month_revenue_change': month_revenue_change,
-            'year_revenue_change': year_revenue_change,
-            'current_month': current_date.strftime("%B"),
-            'current_year': current_year
-        }
+        return analytics.performance(self.db)
 
     def build_performance_indicators(self, parent):
         """Build performance indicators showing if user is doing well"""
@@ -227,8 +195,7 @@ class AnalyticsDashboard(ttk.Frame):
         year_card.grid(row=0, column=1, padx=10, pady=5, sticky="ew")
 
         # Profit margins
-        month_margin = (performance_data['current_month_profit'] / performance_data['current_month_revenue'] * 100) if \
-        performance_data['current_month_revenue'] > 0 else 0
+        month_margin = performance_data['month_margin']
         margin_status = "💰 Excellent!" if month_margin > 30 else "💸 Good" if month_margin > 15 else "⚖️ Check Costs"
         margin_color = "#4CAF50" if month_margin > 30 else "#FF9800" if month_margin > 15 else "#F44336"
 
@@ -292,30 +259,18 @@ class AnalyticsDashboard(ttk.Frame):
         kpi_frame = ttk.Frame(parent)
         kpi_frame.pack(fill="x", pady=(0, 20))
 
-        data = self.db.fetch_items()
-
-        # Calculate KPIs
-        total_items = len(data)
-        sold_items = len([item for item in data if item[2] > 0])
-        total_revenue = sum(item[2] for item in data if item[2] > 0)
-        total_cost = sum(item[1] for item in data)
-        net_profit = total_revenue - sum(item[1] for item in data if item[2] > 0)
-
-        profit_margin = (net_profit / total_revenue * 100) if total_revenue > 0 else 0
-        avg_profit_per_item = net_profit / sold_items if sold_items > 0 else 0
-
-        # Find best performing item
-        profits = [(item[0], item[2] - item[1]) for item in data if item[2] > 0]
-        best_item = max(profits, key=lambda x: x[1], default=("None", 0))
+        # All-time figures, from the precomputed totals
+        figures = analytics.kpis(self.db)
+        best_item = figures["best_item"] or "None"
 
         # KPI data
         kpis = [
-            ("💰 Total Revenue", f"₱{total_revenue:,.2f}", "#4CAF50"),
-            ("📈 Net Profit", f"₱{net_profit:,.2f}", "#2196F3"),
-            ("📊 Profit Margin", f"{profit_margin:.1f}%", "#FF9800"),
-            ("🎯 Avg Profit/Item", f"₱{avg_profit_per_item:,.2f}", "#9C27B0"),
-            ("🏆 Best Item", f"{best_item[0][:15]}...", "#F44336"),
-            ("📦 Items Sold", f"{sold_items}/{total_items}", "#607D8B")
+            ("💰 Total Revenue", f"₱{figures['revenue']:,.2f}", "#4CAF50"),
+            ("📈 Net Profit", f"₱{figures['profit']:,.2f}", "#2196F3"),
+            ("📊 Profit Margin", f"{figures['margin']:.1f}%", "#FF9800"),
+            ("🎯 Avg Profit/Item", f"₱{figures['avg_profit']:,.2f}", "#9C27B0"),
+            ("🏆 Best Item", f"{best_item[:15]}...", "#F44336"),
+            ("📦 Items Sold", f"{figures['sold_count']}/{figures['item_count']}", "#607D8B")
         ]
 
         # Create KPI cards in a grid
@@ -363,8 +318,7 @@ class AnalyticsDashboard(ttk.Frame):
         ttk.Label(filter_frame, text="Select Year:", font=("Segoe UI", 11)).pack(side="left", padx=(0, 10))
 
         # Get available years
-        years = [r[0] for r in self.db.cursor.execute(
-            "SELECT DISTINCT strftime('%Y', date) FROM items ORDER BY date DESC").fetchall()]
+        years = self.db.fetch_years()
 
         self.year_var = tk.StringVar(value=years[0] if years else str(datetime.now().year))
         year_combo = ttk.Combobox(
@@ -407,68 +361,96 @@ class AnalyticsDashboard(ttk.Frame):
         self.update_charts()
 
     def update_charts(self, event=None):
-        # Clear existing charts
-        for widget in self.charts_frame.winfo_children():
-            widget.destroy()
-
         chart_type = self.chart_type_var.get() if hasattr(self, 'chart_type_var') else "Daily Revenue"
         year = self.year_var.get() if hasattr(self, 'year_var') else str(datetime.now().year)
 
-        if chart_type == "Daily Revenue":
-            self.plot_daily_revenue(year)
-        elif chart_type == "Monthly Revenue":
-            self.plot_monthly_revenue(year)
-        elif chart_type == "Annual Revenue":
-            self.plot_annual_revenue()
-        elif chart_type == "Profit Analysis":
-            self.plot_profit_analysis(year)
-        elif chart_type == "Item Performance":
-            self.plot_item_performance()
-
-    def plot_daily_revenue(self, year):
-        """Plot daily revenue for the selected year"""
-        rows = self.db.cursor.execute(
-            "SELECT sold_price, date FROM items WHERE sold_price > 0"
-        ).fetchall()
+        # Widget size must be read on the Tk thread
+        size = self.get_chart_size()
 
-        if not rows:
-            no_data_label = ttk.Label(
-                self.charts_frame,
-                text="📊 No sales data available",
-                font=("Segoe UI", 14),
-                foreground="#888888"
-            )
-            no_data_label.pack(expand=True, pady=50)
+        # A newer selection supersedes a chart that is still being built
+        if self.chart_task is not None:
+            self.chart_task.cancel()
+            self.chart_task = None
+
+        key = (chart_type, year, size, self.db.generation)
+        chart = self.chart_cache.get(key)
+        if chart is not None:
+            self.show_chart(chart)
+            return
+
+        def finished(chart):
+            if chart is not None:
+                self.chart_cache.put(key, chart)
+            self.show_chart(chart)
+
+        self.show_chart("⏳ Loading chart...")
+        self.chart_task = self.tasks.submit(
+            self.build_chart, chart_type, year, size,
+            on_done=finished, owner=self
+        )
+
+    def build_chart(self, chart_type, year, size):
+        """Query the data and build the figure on a worker thread.
+
+        Returns a Figure, or a message to show when there is nothing to plot.
+        """
+        with self.db.worker_session() as db:
+            if chart_type == "Daily Revenue":
+                return self.plot_daily_revenue(db, year, size)
+            elif chart_type == "Monthly Revenue":
+                return self.plot_monthly_revenue(db, year, size)
+            elif chart_type == "Annual Revenue":
+                return self.plot_annual_revenue(db, size)
+            elif chart_type == "Profit Analysis":
+                return self.plot_profit_analysis(db, year, size)
+            elif chart_type == "Item Performance":
+                return self.plot_item_performance(db, size)
+        return None
+
+    def show_chart(self, chart):
+        """Embed a finished figure, or show a message in its place"""
+        # Clear existing charts
+        for widget in self.charts_frame.winfo_children():
+            widget.destroy()
+
+        if chart is None:
             return
 
-        # Process daily data for the selected year
-        daily_sales = {}
-        for price, date_str in rows:
-            try:
-                dt = datetime.strptime(date_str, "%Y-%m-%d")
-                if dt.strftime("%Y") == year:
-                    date_key = dt.strftime("%Y-%m-%d")
-                    daily_sales[date_key] = daily_sales.get(date_key, 0) + price
-            except:
-                continue
-
-        if not daily_sales:
+        if isinstance(chart, str):
             no_data_label = ttk.Label(
                 self.charts_frame,
-                text=f"📊 No sales data for {year}",
+                text=chart,
                 font=("Segoe UI", 14),
                 foreground="#888888"
             )
             no_data_label.pack(expand=True, pady=50)
-            return
+        else:
+            canvas = FigureCanvasTkAgg(chart, master=self.charts_frame)
+            canvas.draw()
+            canvas.get_tk_widget().pack(fill="both", expand=True, padx=10, pady=10)
 
-        # Sort dates and prepare data
-        sorted_dates = sorted(daily_sales.keys())
-        revenues = [daily_sales[date] for date in sorted_dates]
+        # Update scroll region after adding chart
+        self.canvas.update_idletasks()
+        self.canvas.configure(scrollregion=self.canvas.bbox("all"))
+
+    def plot_daily_revenue(self, db, year, size):
+        """Plot daily revenue for the selected year"""
+        rows = db.sales_by_day(year)
+
+        if not rows and not db.has_sales():
+            return "📊 No sales data available"
+
+        if not rows:
+            return f"📊 No sales data for {year}"
+
+        # Rows arrive already summed per day and sorted by date
+        sorted_dates = [day for day, _, _, _ in rows]
+        revenues = [revenue for _, revenue, _, _ in rows]
 
         # Create chart
-        width, height = self.get_chart_size()
-        fig, ax = plt.subplots(figsize=(width, height))
+        width, height = size
+        fig = Figure(figsize=(width, height))
+        ax = fig.subplots()
         fig.patch.set_facecolor('#1a1a1a')
 
         # Convert dates for plotting
@@ -495,47 +477,27 @@ class AnalyticsDashboard(ttk.Frame):
         ax.text(0.02, 0.98, stats_text, transform=ax.transAxes, fontsize=10,
                 verticalalignment='top', color='white', bbox=dict(boxstyle='round', facecolor='black', alpha=0.7))
 
-        plt.tight_layout(pad=3.0)
+        fig.tight_layout(pad=3.0)
 
-        canvas = FigureCanvasTkAgg(fig, master=self.charts_frame)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill="both", expand=True, padx=10, pady=10)
-
-        self.canvas.update_idletasks()
-        self.canvas.configure(scrollregion=self.canvas.bbox("all"))
+        return fig
 
-    def plot_monthly_revenue(self, year):
+    def plot_monthly_revenue(self, db, year, size):
         """Plot monthly revenue with enhanced visualization"""
-        rows = self.db.cursor.execute(
-            "SELECT sold_price, date FROM items WHERE sold_price > 0"
-        ).fetchall()
-
-        if not rows:
-            no_data_label = ttk.Label(
-                self.charts_frame,
-                text="📊 No sales data available",
-                font=("Segoe UI", 14),
-                foreground="#888888"
-            )
-            no_data_label.pack(expand=True, pady=50)
-            return
+        if not db.has_sales():
+            return "📊 No sales data available"
 
         # Process monthly data
         monthly_sales = {m: 0 for m in range(1, 13)}
         monthly_count = {m: 0 for m in range(1, 13)}
 
-        for price, date_str in rows:
-            try:
-                dt = datetime.strptime(date_str, "%Y-%m-%d")
-                if dt.strftime("%Y") == year:
-                    monthly_sales[dt.month] += price
-                    monthly_count[dt.month] += 1
-            except:
-                continue
+        for month, revenue, _, count in db.sales_by_month(year):
+            monthly_sales[month] = revenue
+            monthly_count[month] = count
 
         # Create the chart with responsive sizing
-        width, height = self.get_chart_size()
-        fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(width, height))
+        width, height = size
+        fig = Figure(figsize=(width, height))
+        ax1, ax2 = fig.subplots(2, 1)
         fig.patch.set_facecolor('#1a1a1a')
 
         months = [datetime(2000, m, 1).strftime("%b") for m in range(1, 13)]
@@ -569,57 +531,28 @@ class AnalyticsDashboard(ttk.Frame):
                 ax2.text(bar.get_x() + bar.get_width() / 2, bar.get_height() + max(count_values) * 0.02,
                          f'{val}', ha='center', va='bottom', color='white', fontsize=10)
 
-        plt.tight_layout(pad=3.0)
+        fig.tight_layout(pad=3.0)
 
-        canvas = FigureCanvasTkAgg(fig, master=self.charts_frame)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill="both", expand=True, padx=10, pady=10)
-
-        self.canvas.update_idletasks()
-        self.canvas.configure(scrollregion=self.canvas.bbox("all"))
+        return fig
 
-    def plot_annual_revenue(self):
+    def plot_annual_revenue(self, db, size):
         """Plot annual revenue comparison across all years"""
-        rows = self.db.cursor.execute(
-            "SELECT sold_price, date FROM items WHERE sold_price > 0"
-        ).fetchall()
+        rows = db.sales_by_year()
 
-        if not rows:
-            no_data_label = ttk.Label(
-                self.charts_frame,
-                text="📊 No sales data available",
-                font=("Segoe UI", 14),
-                foreground="#888888"
-            )
-            no_data_label.pack(expand=True, pady=50)
-            return
+        if not rows and not db.has_sales():
+            return "📊 No sales data available"
 
         # Process annual data
-        annual_sales = {}
-        annual_count = {}
-
-        for price, date_str in rows:
-            try:
-                dt = datetime.strptime(date_str, "%Y-%m-%d")
-                year = dt.year
-                annual_sales[year] = annual_sales.get(year, 0) + price
-                annual_count[year] = annual_count.get(year, 0) + 1
-            except:
-                continue
+        annual_sales = {year: revenue for year, revenue, _, _ in rows}
+        annual_count = {year: count for year, _, _, count in rows}
 
         if not annual_sales:
-            no_data_label = ttk.Label(
-                self.charts_frame,
-                text="📊 No annual data available",
-                font=("Segoe UI", 14),
-                foreground="#888888"
-            )
-            no_data_label.pack(expand=True, pady=50)
-            return
+            return "📊 No annual data available"
 
         # Create chart
-        width, height = self.get_chart_size()
-        fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(width, height))
+        width, height = size
+        fig = Figure(figsize=(width, height))
+        ax1, ax2 = fig.subplots(2, 1)
         fig.patch.set_facecolor('#1a1a1a')
 
         years = sorted(annual_sales.keys())
@@ -665,60 +598,28 @@ class AnalyticsDashboard(ttk.Frame):
             ax2.text(bar.get_x() + bar.get_width() / 2, bar.get_height() + max(counts) * 0.02,
                      f'{val}', ha='center', va='bottom', color='white', fontsize=10)
 
-        plt.tight_layout(pad=3.0)
-
-        canvas = FigureCanvasTkAgg(fig, master=self.charts_frame)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill="both", expand=True, padx=10, pady=10)
-
-        self.canvas.update_idletasks()
-        self.canvas.configure(scrollregion=self.canvas.bbox("all"))
+        fig.tight_layout(pad=3.0)
 
-    def plot_profit_analysis(self, year):
-        # Get profit data
-        rows = self.db.cursor.execute(
-            "SELECT name, source_price, sold_price, date FROM items WHERE sold_price > 0"
-        ).fetchall()
+        return fig
 
-        if not rows:
-            no_data_label = ttk.Label(
-                self.charts_frame,
-                text="📈 No profit data available",
-                font=("Segoe UI", 14),
-                foreground="#888888"
-            )
-            no_data_label.pack(expand=True, pady=50)
-            return
+    def plot_profit_analysis(self, db, year, size):
+        # Column arrays for the selected year only, from the shared snapshot
+        data = analytics.profit_analysis(db, year)
+        monthly_profit = data["monthly_profit"]
 
-        # Process profit data
-        year_data = []
-        for name, source, sold, date_str in rows:
-            try:
-                dt = datetime.strptime(date_str, "%Y-%m-%d")
-                if dt.strftime("%Y") == year:
-                    profit = sold - source
-                    margin = (profit / sold * 100) if sold > 0 else 0
-                    year_data.append((name, source, sold, profit, margin))
-            except:
-                continue
-
-        if not year_data:
-            no_data_label = ttk.Label(
-                self.charts_frame,
-                text=f"📈 No profit data for {year}",
-                font=("Segoe UI", 14),
-                foreground="#888888"
-            )
-            no_data_label.pack(expand=True, pady=50)
-            return
+        if not data["count"]:
+            if not db.has_sales():
+                return "📈 No profit data available"
+            return f"📈 No profit data for {year}"
 
         # Create profit analysis charts with responsive sizing
-        width, height = self.get_chart_size()
-        fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(width, height + 2))
+        width, height = size
+        fig = Figure(figsize=(width, height + 2))
+        (ax1, ax2), (ax3, ax4) = fig.subplots(2, 2)
         fig.patch.set_facecolor('#1a1a1a')
 
-        # Sort by profit for top items
-        sorted_by_profit = sorted(year_data, key=lambda x: x[3], reverse=True)[:10]
+        # Top items as (name, cost, sold, profit, roi, margin)
+        sorted_by_profit = data["top_profit"]
 
         # Top profitable items
         names = [item[0][:20] + '...' if len(item[0]) > 20 else item[0] for item in sorted_by_profit]
@@ -737,8 +638,8 @@ class AnalyticsDashboard(ttk.Frame):
                      f'₱{profit:.0f}', ha='left', va='center', color='white', fontsize=9)
 
         # Profit margin distribution
-        margins = [item[4] for item in year_data]
-        ax2.hist(margins, bins=15, color='#FF9800', alpha=0.7, edgecolor='white')
+        counts, edges = data["margin_histogram"]
+        ax2.hist(edges[:-1], bins=edges, weights=counts, color='#FF9800', alpha=0.7, edgecolor='white')
         ax2.set_title('Profit Margin Distribution', color='white', fontsize=14, pad=15)
         ax2.set_xlabel('Profit Margin (%)', color='white', fontsize=12)
         ax2.set_ylabel('Frequency', color='white', fontsize=12)
@@ -746,8 +647,8 @@ class AnalyticsDashboard(ttk.Frame):
         ax2.grid(True, alpha=0.3)
 
         # Investment vs Profit scatter
-        investments = [item[1] for item in year_data]
-        profits_scatter = [item[3] for item in year_data]
+        investments = data["investments"]
+        profits_scatter = data["profits"]
         ax3.scatter(investments, profits_scatter, color='#2196F3', alpha=0.6, s=50)
         ax3.set_title('Investment vs Profit', color='white', fontsize=14, pad=15)
         ax3.set_xlabel('Investment (₱)', color='white', fontsize=12)
@@ -759,21 +660,10 @@ class AnalyticsDashboard(ttk.Frame):
         if len(investments) > 1:
             z = np.polyfit(investments, profits_scatter, 1)
             p = np.poly1d(z)
-            ax3.plot(sorted(investments), p(sorted(investments)), "r--", alpha=0.8, linewidth=2)
+            ordered = np.sort(investments)
+            ax3.plot(ordered, p(ordered), "r--", alpha=0.8, linewidth=2)
 
         # Monthly profit trend
-        monthly_profit = {m: 0 for m in range(1, 13)}
-        for item in year_data:
-            # Need to get month from original data
-            for name, source, sold, date_str in rows:
-                if name == item[0] and source == item[1] and sold == item[2]:
-                    try:
-                        dt = datetime.strptime(date_str, "%Y-%m-%d")
-                        monthly_profit[dt.month] += item[3]
-                        break
-                    except:
-                        continue
-
         months = [datetime(2000, m, 1).strftime("%b") for m in range(1, 13)]
         profit_values = [monthly_profit[m] for m in range(1, 13)]
 
@@ -790,43 +680,27 @@ class AnalyticsDashboard(ttk.Frame):
                 ax4.text(i, val + max(profit_values) * 0.02, f'₱{val:.0f}',
                          ha='center', va='bottom', color='white', fontsize=9)
 
-        plt.tight_layout(pad=3.0)
+        fig.tight_layout(pad=3.0)
 
-        # Embed in tkinter
-        canvas = FigureCanvasTkAgg(fig, master=self.charts_frame)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill="both", expand=True, padx=10, pady=10)
+        return fig
 
-        # Update scroll region after adding chart
-        self.canvas.update_idletasks()
-        self.canvas.configure(scrollregion=self.canvas.bbox("all"))
+    def plot_item_performance(self, db, size):
+        # Top items and price ranges over every sale, from the shared snapshot
+        data = analytics.item_performance(db)
+        sale_count = data["count"]
 
-    def plot_item_performance(self):
-        # Get all items performance data
-        rows = self.db.fetch_items()
-
-        if not rows:
-            no_data_label = ttk.Label(
-                self.charts_frame,
-                text="📋 No item data available",
-                font=("Segoe UI", 14),
-                foreground="#888888"
-            )
-            no_data_label.pack(expand=True, pady=50)
-            return
-
-        # Separate sold and unsold items
-        sold_items = [(name, source, sold, sold - source) for name, source, sold, date in rows if sold > 0]
-        unsold_items = [(name, source) for name, source, sold, date in rows if sold == 0]
+        if not sale_count and not data["unsold_count"]:
+            return "📋 No item data available"
 
         # Create responsive figure for better visibility
-        width, height = self.get_chart_size()
-        fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(width, height + 2))
+        width, height = size
+        fig = Figure(figsize=(width, height + 2))
+        (ax1, ax2), (ax3, ax4) = fig.subplots(2, 2)
         fig.patch.set_facecolor('#1a1a1a')
 
         # Performance by profit
-        if sold_items:
-            sold_items_sorted = sorted(sold_items, key=lambda x: x[3], reverse=True)[:15]
+        if sale_count:
+            sold_items_sorted = data["top_profit"]
             names = [item[0][:18] + '...' if len(item[0]) > 18 else item[0] for item in sold_items_sorted]
             profits = [item[3] for item in sold_items_sorted]
 
@@ -846,12 +720,11 @@ class AnalyticsDashboard(ttk.Frame):
                          va='center', color='white', fontsize=9)
 
         # ROI (Return on Investment) analysis
-        if sold_items:
-            roi_data = [(item[0], (item[3] / item[1] * 100) if item[1] > 0 else 0) for item in sold_items]
-            roi_sorted = sorted(roi_data, key=lambda x: x[1], reverse=True)[:10]
+        if sale_count:
+            roi_sorted = data["top_roi"][:10]
 
             names_roi = [item[0][:18] + '...' if len(item[0]) > 18 else item[0] for item in roi_sorted]
-            roi_values = [item[1] for item in roi_sorted]
+            roi_values = [item[4] for item in roi_sorted]
 
             ax2.barh(names_roi, roi_values, color='#FF9800')
             ax2.set_title('Top ROI Items (%)', color='white', fontsize=14, pad=15)
@@ -866,22 +739,9 @@ class AnalyticsDashboard(ttk.Frame):
                          f'{roi:.1f}%', ha='left', va='center', color='white', fontsize=9)
 
         # Price range analysis
-        if sold_items:
-            price_ranges = ['₱0-100', '₱101-500', '₱501-1000', '₱1001-2000', '₱2000+']
-            range_counts = [0, 0, 0, 0, 0]
-
-            for item in sold_items:
-                price = item[2]  # sold price
-                if price <= 100:
-                    range_counts[0] += 1
-                elif price <= 500:
-                    range_counts[1] += 1
-                elif price <= 1000:
-                    range_counts[2] += 1
-                elif price <= 2000:
-                    range_counts[3] += 1
-                else:
-                    range_counts[4] += 1
+        if sale_count:
+            price_ranges = [label for label, _ in analytics.PRICE_RANGES]
+            range_counts = data["price_ranges"]
 
             # Only show pie chart if there's data
             if sum(range_counts) > 0:
@@ -900,9 +760,9 @@ class AnalyticsDashboard(ttk.Frame):
                     autotext.set_fontsize(9)
 
         # Status overview
-        total_items = len(rows)
-        sold_count = len(sold_items)
-        unsold_count = len(unsold_items)
+        sold_count = data["sold_count"]
+        unsold_count = data["unsold_count"]
+        total_items = sold_count + unsold_count
 
         if total_items > 0:
             labels = ['Sold', 'Unsold']
@@ -922,24 +782,17 @@ class AnalyticsDashboard(ttk.Frame):
                 autotext.set_fontweight('bold')
                 autotext.set_fontsize(9)
 
-        plt.tight_layout(pad=3.0)
+        fig.tight_layout(pad=3.0)
 
-        # Embed in tkinter
-        canvas = FigureCanvasTkAgg(fig, master=self.charts_frame)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill="both", expand=True, padx=10, pady=10)
-
-        # Update scroll region after adding chart
-        self.canvas.update_idletasks()
-        self.canvas.configure(scrollregion=self.canvas.bbox("all"))
+        return fig
 
     def refresh_dashboard(self):
         # Clear the scrollable frame
         for widget in self.scrollable_frame.winfo_children():
             widget.destroy()
 
-        # Rebuild dashboard
-        self.build_modern_dashboard()
+        # Rebuild dashboard inside the existing scroll area
+        self.build_dashboard_content()
 
         # Reset scroll position
         self.canvas.yview_moveto(0)
\ No newline at end of file
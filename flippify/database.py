@@ -1,47 +1,1128 @@
+import copy
 import sqlite3
+import queue
+import threading
+import traceback
+from collections import namedtuple
+from concurrent.futures import Future
+from contextlib import contextmanager
+from datetime import date as _date, datetime as _datetime
+
+
+# Published to subscribers after every committed write to items. kind is
+# 'inserted', 'updated' or 'deleted'; ids is None when too many rows changed
+# to list them, e.g. a bulk import or clearing the table.
+DataChange = namedtuple("DataChange", "kind ids")
+
+
+# Rollup tables maintained by triggers on items, so dashboards read
+# precomputed totals instead of scanning the ledger. sales_rollup holds sold
+# items per ('day', 'YYYY-MM-DD'), ('month', 'YYYY-MM') and ('year', 'YYYY')
+# bucket; item_totals is a single all-time row.
+ROLLUP_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS sales_rollup (
+        period TEXT NOT NULL,
+        bucket TEXT NOT NULL,
+        revenue REAL NOT NULL DEFAULT 0,
+        cost REAL NOT NULL DEFAULT 0,
+        count INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (period, bucket)
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS item_totals (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        item_count INTEGER NOT NULL DEFAULT 0,
+        cost REAL NOT NULL DEFAULT 0,
+        sold_count INTEGER NOT NULL DEFAULT 0,
+        sold_cost REAL NOT NULL DEFAULT 0,
+        revenue REAL NOT NULL DEFAULT 0
+    )
+    """,
+]
+
+
+# SQL templates for a date column's ('day', 'month', 'year') bucket keys.
+# Until migration 5 items.date was 'YYYY-MM-DD' text; since then it is an
+# integer day number (days since 1970-01-01).
+TEXT_DATE_BUCKETS = ("date({})", "strftime('%Y-%m', {})", "strftime('%Y', {})")
+DAY_NUMBER_BUCKETS = (
+    "date({} * 86400, 'unixepoch')",
+    "strftime('%Y-%m', {} * 86400, 'unixepoch')",
+    "strftime('%Y', {} * 86400, 'unixepoch')",
+)
+
+# Day number columns rendered as 'YYYY-MM-DD', which is what the query methods return
+DATE_TEXT = DAY_NUMBER_BUCKETS[0].format("date")
+SOLD_DATE_TEXT = DAY_NUMBER_BUCKETS[0].format("sold_date")
+ITEM_COLUMNS = f"id, name, source_price, sold_price, {DATE_TEXT} AS date, status, {SOLD_DATE_TEXT} AS sold_date"
+# The same row shape for queries limited to status = 'unsold', read entirely
+# from the idx_items_unsold partial index
+UNSOLD_COLUMNS = f"id, name, source_price, sold_price, {DATE_TEXT} AS date, status, NULL AS sold_date"
+
+# What makes a row a sale, as a template over the row prefix ('NEW.', 'OLD.'
+# or ''). Until migration 6 a sale was any item with a sold price.
+SOLD_BY_PRICE = "{row}sold_price > 0"
+SOLD_BY_STATUS = "{row}status = 'sold'"
+
+_EPOCH_ORDINAL = _date(1970, 1, 1).toordinal()
+
+# The date format the forms have always validated with; month and day may
+# be written without zero padding, e.g. 2025-6-1
+DATE_FORMAT = "%Y-%m-%d"
+
+
+def to_day_number(text):
+    """A DATE_FORMAT date to the integer stored in items.date; raises ValueError if malformed"""
+    return _datetime.strptime(text, DATE_FORMAT).toordinal() - _EPOCH_ORDINAL
+
+
+ROLLUP_TRIGGER_NAMES = (
+    "items_rollup_insert", "items_rollup_delete", "items_rollup_update_old", "items_rollup_update_new",
+    "items_totals_insert", "items_totals_delete", "items_totals_update",
+)
+
+
+def _rollup_triggers(buckets=TEXT_DATE_BUCKETS, sold=SOLD_BY_PRICE, date_column="date"):
+    """Trigger DDL keeping sales_rollup and item_totals in step with items"""
+    def add_sale(row, sign):
+        day, month, year = (bucket.format(f"{row}.{date_column}") for bucket in buckets)
+        sale_buckets = f"""
+            ((period = 'day' AND bucket = {day})
+             OR (period = 'month' AND bucket = {month})
+             OR (period = 'year' AND bucket = {year}))
+        """
+        # Registers the sale's buckets (if new), applies its amounts to all three
+        # and drops those left empty, touching no other rollup rows
+        return f"""
+            INSERT OR IGNORE INTO sales_rollup (period, bucket) VALUES
+                ('day', {day}),
+                ('month', {month}),
+                ('year', {year});
+            UPDATE sales_rollup
+            SET revenue = revenue {sign} {row}.sold_price,
+                cost = cost {sign} {row}.source_price,
+                count = count {sign} 1
+            WHERE {sale_buckets};
+            DELETE FROM sales_rollup WHERE count <= 0 AND {sale_buckets};
+        """
+
+    def totals(row, sign):
+        is_sold = sold.format(row=row + ".")
+        return f"""
+            item_count = item_count {sign} 1,
+            cost = cost {sign} {row}.source_price,
+            sold_count = sold_count {sign} ({is_sold}),
+            sold_cost = sold_cost {sign} CASE WHEN {is_sold} THEN {row}.source_price ELSE 0 END,
+            revenue = revenue {sign} CASE WHEN {is_sold} THEN {row}.sold_price ELSE 0 END
+        """
+
+    def is_sale(row):
+        return f"{sold.format(row=row + '.')} AND {buckets[0].format(f'{row}.{date_column}')} IS NOT NULL"
+
+    return [
+        f"""
+        CREATE TRIGGER IF NOT EXISTS items_rollup_insert AFTER INSERT ON items
+        WHEN {is_sale("NEW")}
+        BEGIN {add_sale("NEW", "+")} END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS items_rollup_delete AFTER DELETE ON items
+        WHEN {is_sale("OLD")}
+        BEGIN {add_sale("OLD", "-")} END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS items_rollup_update_old AFTER UPDATE ON items
+        WHEN {is_sale("OLD")}
+        BEGIN {add_sale("OLD", "-")} END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS items_rollup_update_new AFTER UPDATE ON items
+        WHEN {is_sale("NEW")}
+        BEGIN {add_sale("NEW", "+")} END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS items_totals_insert AFTER INSERT ON items
+        BEGIN UPDATE item_totals SET {totals("NEW", "+")} WHERE id = 1; END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS items_totals_delete AFTER DELETE ON items
+        BEGIN UPDATE item_totals SET {totals("OLD", "-")} WHERE id = 1; END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS items_totals_update AFTER UPDATE ON items
+        BEGIN
+            UPDATE item_totals SET {totals("OLD", "-")} WHERE id = 1;
+            UPDATE item_totals SET {totals("NEW", "+")} WHERE id = 1;
+        END
+        """,
+    ]
+
+
+def _rollup_rebuild(buckets=TEXT_DATE_BUCKETS, sold=SOLD_BY_PRICE, date_column="date"):
+    """SQL recomputing every rollup from items"""
+    day, month, year = (bucket.format(date_column) for bucket in buckets)
+    is_sold = sold.format(row="")
+    return [
+        "DELETE FROM sales_rollup",
+        f"""
+        INSERT INTO sales_rollup (period, bucket, revenue, cost, count)
+        SELECT 'day', {day}, SUM(sold_price), SUM(source_price), COUNT(*)
+        FROM items WHERE {is_sold} AND {day} IS NOT NULL GROUP BY {day}
+        UNION ALL
+        SELECT 'month', {month}, SUM(sold_price), SUM(source_price), COUNT(*)
+        FROM items WHERE {is_sold} AND {day} IS NOT NULL GROUP BY {month}
+        UNION ALL
+        SELECT 'year', {year}, SUM(sold_price), SUM(source_price), COUNT(*)
+        FROM items WHERE {is_sold} AND {day} IS NOT NULL GROUP BY {year}
+        """,
+        "DELETE FROM item_totals",
+        f"""
+        INSERT INTO item_totals (id, item_count, cost, sold_count, sold_cost, revenue)
+        SELECT 1, COUNT(*), COALESCE(SUM(source_price), 0),
+               COALESCE(SUM({is_sold}), 0),
+               COALESCE(SUM(CASE WHEN {is_sold} THEN source_price ELSE 0 END), 0),
+               COALESCE(SUM(CASE WHEN {is_sold} THEN sold_price ELSE 0 END), 0)
+        FROM items
+        """,
+    ]
+
+
+# Recomputes every rollup from items for the current schema. Bulk imports
+# (through rebuild_rollups) and delete_all_items run it to clear the
+# floating-point drift left by adding and subtracting amounts row by row
+ROLLUP_REBUILD = _rollup_rebuild(DAY_NUMBER_BUCKETS, SOLD_BY_STATUS, "sold_date")
+
+
+def _store_dates_as_day_numbers(cursor):
+    """Migration 5: rebuild items with typed, validated columns and integer day numbers.
+
+    Rows whose date cannot be read, or whose prices are missing or negative,
+    are moved to items_rejected with the reason rather than dropped.
+    """
+    cursor.execute("""
+        CREATE TABLE items_typed (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL CHECK (length(name) > 0),
+            source_price REAL NOT NULL CHECK (source_price >= 0),
+            sold_price REAL NOT NULL DEFAULT 0 CHECK (sold_price >= 0),
+            date INTEGER NOT NULL CHECK (typeof(date) = 'integer')
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS items_rejected (
+            id INTEGER PRIMARY KEY,
+            name TEXT,
+            source_price,
+            sold_price,
+            date,
+            reason TEXT
+        )
+    """)
+
+    typed, rejected = [], []
+    for item_id, name, source, sold, text in cursor.execute("SELECT * FROM items").fetchall():
+        try:
+            # Anything after the date itself (e.g. a time) is ignored
+            day = to_day_number((str(text).split() or [""])[0])
+        except ValueError:
+            rejected.append((item_id, name, source, sold, text, "invalid date"))
+            continue
+        try:
+            source, sold = float(source), float(sold or 0)
+        except (TypeError, ValueError):
+            rejected.append((item_id, name, source, sold, text, "invalid price"))
+            continue
+        if not name or source < 0 or sold < 0:
+            rejected.append((item_id, name, source, sold, text, "missing name or negative price"))
+            continue
+        typed.append((item_id, name, source, sold, day))
+
+    cursor.executemany("INSERT INTO items_typed VALUES (?, ?, ?, ?, ?)", typed)
+    cursor.executemany("INSERT INTO items_rejected VALUES (?, ?, ?, ?, ?, ?)", rejected)
+    if rejected:
+        print(f"Moved {len(rejected)} unreadable item(s) to items_rejected")
+
+    # Keep AUTOINCREMENT from reusing the ids of deleted items
+    last_id = cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = 'items'").fetchone()
+    cursor.execute("DROP TABLE items")
+    cursor.execute("ALTER TABLE items_typed RENAME TO items")
+    if last_id:
+        cursor.execute("DELETE FROM sqlite_sequence WHERE name = 'items'")
+        cursor.execute("INSERT INTO sqlite_sequence (name, seq) SELECT 'items', MAX(?, COALESCE(MAX(id), 0)) FROM items",
+                       last_id)
+
+    for sql in [
+        "CREATE INDEX idx_items_date ON items(date)",
+        "CREATE INDEX idx_items_sold_price ON items(sold_price, date, source_price)",
+        "CREATE INDEX idx_items_name ON items(name, source_price, sold_price, date)",
+        "CREATE INDEX idx_items_unsold ON items(id, name, source_price, sold_price, date) WHERE sold_price = 0",
+    ] + _rollup_triggers(DAY_NUMBER_BUCKETS) + _rollup_rebuild(DAY_NUMBER_BUCKETS):
+        cursor.execute(sql)
+
+
+# Stand-ins for a table CHECK, which ALTER TABLE cannot add: a sale must have
+# a sale date, and an unsold item has neither a sold price nor a sale date
+STATUS_TRIGGERS = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS items_status_{event.lower()} BEFORE {event} ON items
+    WHEN CASE NEW.status WHEN 'sold' THEN NEW.sold_date IS NULL
+         ELSE NEW.sold_date IS NOT NULL OR NEW.sold_price != 0 END
+    BEGIN SELECT RAISE(ABORT, 'status does not match sold_price and sold_date'); END
+    """
+    for event in ("INSERT", "UPDATE")
+]
+
+
+# Schema migrations, applied in order. PRAGMA user_version stores how many
+# have run, so each step executes exactly once per database file. A step is
+# either a list of SQL statements or a callable taking a cursor. Only ever
+# append new steps; never edit ones that have shipped.
+MIGRATIONS = [
+    # 1: base items table
+    [
+        """
+        CREATE TABLE IF NOT EXISTS items (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT,
+            source_price REAL,
+            sold_price REAL,
+            date TEXT
+        )
+        """,
+    ],
+    # 2: covering indexes for date filters, sold/unsold splits and value lookups
+    [
+        "CREATE INDEX IF NOT EXISTS idx_items_date ON items(date)",
+        "CREATE INDEX IF NOT EXISTS idx_items_sold_price ON items(sold_price, date, source_price)",
+        "CREATE INDEX IF NOT EXISTS idx_items_name ON items(name, source_price, sold_price, date)",
+    ],
+    # 3: trigger-maintained sales rollups and all-time totals
+    ROLLUP_SCHEMA + _rollup_triggers(TEXT_DATE_BUCKETS) + _rollup_rebuild(TEXT_DATE_BUCKETS),
+    # 4: partial covering index over the unsold partition for the inventory list and search
+    [
+        """
+        CREATE INDEX IF NOT EXISTS idx_items_unsold
+        ON items(id, name, source_price, sold_price, date) WHERE sold_price = 0
+        """,
+    ],
+    # 5: NOT NULL, CHECKed columns and dates as integer day numbers
+    _store_dates_as_day_numbers,
+    # 6: explicit sold/unsold status and a sale date kept apart from the acquisition date,
+    # so a zero-price giveaway is a sale and the unsold set gets its own partial index
+    [
+        """
+        ALTER TABLE items ADD COLUMN status TEXT NOT NULL DEFAULT 'unsold'
+        CHECK (status IN ('unsold', 'sold'))
+        """,
+        "ALTER TABLE items ADD COLUMN sold_date INTEGER CHECK (sold_date IS NULL OR typeof(sold_date) = 'integer')",
+        # Until now the one date column held the sale date once an item sold
+        "UPDATE items SET status = 'sold', sold_date = date WHERE sold_price > 0",
+    ]
+    + STATUS_TRIGGERS
+    + [
+        "DROP INDEX idx_items_sold_price",
+        "DROP INDEX idx_items_unsold",
+        # status is repeated as a column because SQLite only treats a partial
+        # index as covering when it holds the columns of its own WHERE clause
+        "CREATE INDEX idx_items_unsold ON items(id, name, source_price, sold_price, date, status) WHERE status = 'unsold'",
+        "CREATE INDEX idx_items_sold ON items(sold_date, sold_price, source_price, name, status) WHERE status = 'sold'",
+        # Sales ordered by profit, so best_item reads the first entry instead of sorting
+        "CREATE INDEX idx_items_sale_profit ON items(sold_price - source_price) WHERE status = 'sold'",
+    ]
+    + [f"DROP TRIGGER {name}" for name in ROLLUP_TRIGGER_NAMES]
+    + _rollup_triggers(DAY_NUMBER_BUCKETS, SOLD_BY_STATUS, "sold_date")
+    + _rollup_rebuild(DAY_NUMBER_BUCKETS, SOLD_BY_STATUS, "sold_date"),
+    # 7: before-images of the rows changed by the last batch edit, for undo
+    [
+        """
+        CREATE TABLE undo_log (
+            item_id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            source_price REAL NOT NULL,
+            sold_price REAL NOT NULL,
+            date INTEGER NOT NULL,
+            status TEXT NOT NULL,
+            sold_date INTEGER,
+            label TEXT NOT NULL
+        )
+        """,
+    ],
+]
+
+
+# Applied to every connection. WAL lets the pooled readers run while the
+# writer commits; synchronous=NORMAL is still corruption-safe under WAL and
+# only risks the last commits on power loss. mmap and cache sizes are in
+# bytes and KiB (negative cache_size) respectively.
+PRAGMAS = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA mmap_size = 268435456",
+    "PRAGMA cache_size = -32000",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA busy_timeout = 5000",
+)
+
+
+# Ids bound per IN (...) list, well under SQLite's host parameter limit
+ID_CHUNK_SIZE = 500
+
+
+def _chunks(ids):
+    ids = list(ids)
+    for start in range(0, len(ids), ID_CHUNK_SIZE):
+        yield ids[start:start + ID_CHUNK_SIZE]
+
+
+def _placeholders(values):
+    return ", ".join("?" * len(values))
+
+
+def _execute(cursor, sql, params=()):
+    cursor.execute(sql, params)
+    return cursor.rowcount
+
+
+def _executemany(cursor, sql, rows):
+    cursor.executemany(sql, rows)
+    return cursor.rowcount
+
+
+def _executescript(cursor, statements):
+    for sql in statements:
+        cursor.execute(sql)
+    return True
+
+
+class WriteQueue:
+    """One thread and connection that every write to a database goes through.
+
+    Callers block until their write is committed, from any thread. Writes
+    that queue up while a commit is in progress are run together in the next
+    transaction, each inside its own savepoint, so a burst of saves costs a
+    single commit and a failing write does not undo the others.
+    """
+
+    MAX_GROUP = 64
+
+    def __init__(self, connect):
+        self._jobs = queue.Queue()
+        # Guards _closed, so no write is queued behind the stop marker
+        self._lock = threading.Lock()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, args=(connect,), name="flippify-writer", daemon=True)
+        self._thread.start()
+
+    def run(self, func, *args):
+        """Call func(cursor, *args) on the writer and return its result once committed.
+
+        Raises sqlite3.ProgrammingError once the queue is closed.
+        """
+        future = Future()
+        with self._lock:
+            if self._closed:
+                raise sqlite3.ProgrammingError("Cannot write to a closed database.")
+            self._jobs.put((future, func, args))
+        return future.result()
+
+    def close(self):
+        """Finish the queued writes and stop the thread; later writes raise"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._jobs.put(None)
+        self._thread.join()
+
+    def _run(self, connect):
+        conn = connect()
+        # Transactions are opened and closed explicitly below
+        conn.isolation_level = None
+        cursor = conn.cursor()
+        stopping = False
+        try:
+            while not stopping:
+                group = [self._jobs.get()]
+                while len(group) < self.MAX_GROUP:
+                    try:
+                        group.append(self._jobs.get_nowait())
+                    except queue.Empty:
+                        break
+                if None in group:
+                    stopping = True
+                    group.remove(None)
+                if group:
+                    self._commit(conn, cursor, group)
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _commit(conn, cursor, group):
+        outcomes = []
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            for future, func, args in group:
+                cursor.execute("SAVEPOINT write")
+                try:
+                    outcomes.append((future, func(cursor, *args), None))
+                except Exception as e:
+                    cursor.execute("ROLLBACK TO write")
+                    outcomes.append((future, None, e))
+                cursor.execute("RELEASE write")
+            cursor.execute("COMMIT")
+        except sqlite3.Error as e:
+            if conn.in_transaction:
+                cursor.execute("ROLLBACK")
+            for future, _, _ in group:
+                future.set_exception(e)
+            return
+
+        # Results are handed back only once the whole group is durable
+        for future, result, error in outcomes:
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(error)
+
+
+class ItemBatch:
+    """Edits collected by DatabaseManager.batch() and committed as one undoable unit.
+
+    Statements are only recorded here; nothing touches the database until
+    the batch is applied.
+    """
+
+    def __init__(self, label):
+        self.label = label
+        self.statements = []
+        self.updated_ids = set()
+        self.deleted_ids = set()
+        # Items the batch changed, set once it has been applied
+        self.changed = 0
+
+    def __len__(self):
+        return len(self.statements)
+
+    def mark_sold(self, item_id, sold_price, date=None):
+        """Record a sale, as DatabaseManager.mark_sold"""
+        day = to_day_number(date) if date is not None else _date.today().toordinal() - _EPOCH_ORDINAL
+        self._add(
+            "UPDATE items SET status='sold', sold_price=?, sold_date=? WHERE id=?",
+            (sold_price, day, item_id), self.updated_ids, item_id
+        )
+
+    def reprice(self, item_id, source_price=None, sold_price=None):
+        """Change an item's source and/or sold price; a sold price only applies to sold items"""
+        self._add(
+            """
+            UPDATE items SET source_price = COALESCE(?, source_price),
+                sold_price = CASE WHEN status = 'sold' THEN COALESCE(?, sold_price) ELSE sold_price END
+            WHERE id=?
+            """,
+            (source_price, sold_price, item_id), self.updated_ids, item_id
+        )
+
+    def delete(self, item_id):
+        self._add("DELETE FROM items WHERE id=?", (item_id,), self.deleted_ids, item_id)
+
+    def _add(self, sql, params, ids, item_id):
+        self.statements.append((sql, params))
+        ids.add(item_id)
+
 
 class DatabaseManager:
-    def __init__(self, db_name="flippify.db"):
-        self.conn = sqlite3.connect(db_name)
+    """Application-wide SQLite access shared by every tab.
+
+    The main connection is used for reads on the Tk thread. Worker threads
+    borrow connections from a small pool through ``connection()``. Every
+    write, from any thread, goes through a single WriteQueue, so with WAL
+    enabled readers never wait on a save.
+    """
+
+    def __init__(self, db_name="flippify.db", pool_size=2):
+        self.db_name = db_name
+        self.pool_size = pool_size
+        self.conn = self._configure(sqlite3.connect(db_name))
         self.cursor = self.conn.cursor()
-        self.cursor.execute("""
-            CREATE TABLE IF NOT EXISTS items (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT,
-                source_price REAL,
-                sold_price REAL,
-                date TEXT
-            )
-        """)
-        self.conn.commit()
-
-    def insert_item(self, name, source_price, sold_price, date):
-        self.cursor.execute(
-            "SELECT 1 FROM items WHERE name=? AND source_price=? AND sold_price=? AND date=?",
-            (name, source_price, sold_price, date)
-        )
-        if not self.cursor.fetchone():
+        self.migrate()
+        self.writer = WriteQueue(lambda: self._configure(sqlite3.connect(db_name)))
+
+        # Bumped on every write; a list so worker sessions (shallow copies) share it
+        self._generation = [0]
+        self._listeners = []
+
+        # Lazily filled pool of connections for worker threads
+        self._pool = queue.LifoQueue()
+        self._pool_lock = threading.Lock()
+        self._pool_created = 0
+
+    def schema_version(self):
+        return self.conn.execute("PRAGMA user_version").fetchone()[0]
+
+    def migrate(self):
+        """Bring the schema up to date, one transaction per migration step"""
+        version = self.schema_version()
+        for target, step in enumerate(MIGRATIONS[version:], start=version + 1):
+            try:
+                self.cursor.execute("BEGIN")
+                if callable(step):
+                    step(self.cursor)
+                else:
+                    for sql in step:
+                        self.cursor.execute(sql)
+                # PRAGMA does not accept bound parameters
+                self.cursor.execute(f"PRAGMA user_version = {target}")
+                self.conn.commit()
+            except Exception:
+                self.conn.rollback()
+                raise
+        if version < len(MIGRATIONS):
+            self.cursor.execute("ANALYZE")
+
+    @staticmethod
+    def _configure(conn):
+        for pragma in PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    def _connect(self):
+        # Pooled connections move between threads but are only used by one at a time
+        return self._configure(sqlite3.connect(self.db_name, check_same_thread=False))
+
+    @contextmanager
+    def connection(self):
+        """Borrow a pooled connection for use off the main thread"""
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            with self._pool_lock:
+                can_create = self._pool_created < self.pool_size
+                if can_create:
+                    self._pool_created += 1
+            conn = self._connect() if can_create else self._pool.get()
+
+        try:
+            yield conn
+        finally:
+            self._pool.put(conn)
+
+    @contextmanager
+    def worker_session(self):
+        """This manager's query API bound to a pooled connection, for worker threads.
+
+        Writes made through a session bump the generation but notify no
+        listeners, since listeners touch widgets; call publish() from the Tk
+        thread once the work is done.
+        """
+        with self.connection() as conn:
+            session = copy.copy(self)
+            session.conn = conn
+            session.cursor = conn.cursor()
+            session._listeners = []
+            yield session
+
+    @property
+    def generation(self):
+        """Counter that changes whenever this manager writes to items, for cache keys"""
+        return self._generation[0]
+
+    def subscribe(self, listener):
+        """Call listener(DataChange) after every write.
+
+        Listeners run on the thread that made the write, which for the GUI is
+        the Tk thread.
+        """
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _changed(self, result, kind, ids=None):
+        """Bump the generation and notify listeners if a write changed anything; returns result"""
+        if result:
+            self._generation[0] += 1
+            self.publish(kind, ids)
+        return result
+
+    def publish(self, kind, ids=None):
+        """Call every listener with DataChange(kind, ids)"""
+        change = DataChange(kind, ids)
+        for listener in list(self._listeners):
+            try:
+                listener(change)
+            except Exception as e:
+                # A broken view must not turn a committed write into a failure
+                print(f"Error in data change listener: {e}")
+                traceback.print_exc()
+
+    INSERT_SQL = "INSERT INTO items (name, source_price, sold_price, date, status, sold_date) VALUES (?, ?, ?, ?, ?, ?)"
+    # Single-statement insert that skips exact duplicates, so no SELECT round-trip is needed
+    INSERT_UNIQUE_SQL = """
+        INSERT INTO items (name, source_price, sold_price, date, status, sold_date)
+        SELECT ?, ?, ?, ?, ?, ?
+        WHERE NOT EXISTS (
+            SELECT 1 FROM items WHERE name=? AND source_price=? AND sold_price=? AND date=?
+        )
+    """
+
+    @staticmethod
+    def _item_row(name, source_price, sold_price, date, sold_date=None):
+        """Column values for INSERT_SQL from a form or import row.
+
+        An item with a sold price or a sale date is a sale; without a sale
+        date it is taken to have sold on its own date.
+        """
+        if sold_date is None and not sold_price > 0:
+            return name, source_price, sold_price, to_day_number(date), "unsold", None
+        return name, source_price, sold_price, to_day_number(date), "sold", to_day_number(sold_date or date)
+
+    def insert_item(self, name, source_price, sold_price, date, sold_date=None):
+        """Insert an item unless an identical row already exists; dates are 'YYYY-MM-DD'"""
+        try:
+            row = self._item_row(name, source_price, sold_price, date, sold_date)
+
+            def insert(cursor):
+                cursor.execute(self.INSERT_UNIQUE_SQL, row + row[:4])
+                return cursor.rowcount, cursor.lastrowid
+
+            inserted, item_id = self._write(insert)
+            return self._changed(inserted > 0, "inserted", [item_id])
+        except (sqlite3.Error, ValueError) as e:
+            print(f"Error inserting item: {e}")
+            return False
+
+    def insert_items(self, items, check_duplicates=True):
+        """Insert many (name, source_price, sold_price, date) rows in one transaction.
+
+        Returns the number of rows actually inserted. Pass check_duplicates=False
+        when the caller has already filtered out existing rows.
+        """
+        rows = (self._item_row(*item) for item in items)
+        try:
+            if check_duplicates:
+                inserted = self._write(_executemany, self.INSERT_UNIQUE_SQL, (row + row[:4] for row in rows))
+            else:
+                inserted = self._write(_executemany, self.INSERT_SQL, rows)
+            return self._changed(inserted, "inserted")
+        except (sqlite3.Error, ValueError) as e:
+            print(f"Error inserting items: {e}")
+            return 0
+
+    def fetch_items(self):
+        """Fetch (id, name, source_price, sold_price, date, status, sold_date) for every item, newest first"""
+        try:
+            self.cursor.execute(f"SELECT {ITEM_COLUMNS} FROM items ORDER BY id DESC")
+            return self.cursor.fetchall()
+        except sqlite3.Error as e:
+            print(f"Error fetching items: {e}")
+            return []
+
+    def fetch_items_page(self, offset, limit):
+        """Fetch one page of item rows (as fetch_items), newest first"""
+        try:
             self.cursor.execute(
-                "INSERT INTO items (name, source_price, sold_price, date) VALUES (?, ?, ?, ?)",
-                (name, source_price, sold_price, date)
+                f"SELECT {ITEM_COLUMNS} FROM items ORDER BY id DESC LIMIT ? OFFSET ?",
+                (limit, offset)
             )
-            self.conn.commit()
+            return self.cursor.fetchall()
+        except sqlite3.Error as e:
+            print(f"Error fetching items page: {e}")
+            return []
 
-    def fetch_items(self):
-        self.cursor.execute("SELECT name, source_price, sold_price, date FROM items ORDER BY id DESC")
-        return self.cursor.fetchall()
+    def fetch_items_by_id(self, ids):
+        """Fetch item rows (as fetch_items) for the given ids, newest first"""
+        rows = []
+        try:
+            for chunk in _chunks(ids):
+                self.cursor.execute(
+                    f"SELECT {ITEM_COLUMNS} FROM items WHERE id IN ({_placeholders(chunk)})",
+                    chunk
+                )
+                rows += self.cursor.fetchall()
+            return sorted(rows, reverse=True)
+        except sqlite3.Error as e:
+            print(f"Error fetching items: {e}")
+            return []
 
-    def delete_all_items(self):
-        self.cursor.execute("DELETE FROM items")
-        self.conn.commit()
+    def fetch_item_keys(self):
+        """Set of (name, source_price, sold_price, date) tuples, for duplicate checks in bulk"""
+        try:
+            self.cursor.execute(f"SELECT name, source_price, sold_price, {DATE_TEXT} FROM items")
+            return set(self.cursor.fetchall())
+        except sqlite3.Error as e:
+            print(f"Error fetching item keys: {e}")
+            return set()
+
+    def fetch_sold_items(self, year=None, since=None):
+        """Fetch (name, source_price, sold_price, sold_date) for sold items.
+
+        year limits the rows to sales in one calendar year; since keeps only
+        items sold after the given YYYY-MM-DD day.
+        """
+        where, params = self._sold_filter(year, since)
+        try:
+            self.cursor.execute(
+                f"""
+                SELECT name, source_price, sold_price, {SOLD_DATE_TEXT} FROM items
+                WHERE {where}
+                ORDER BY id DESC
+                """,
+                params
+            )
+            return self.cursor.fetchall()
+        except sqlite3.Error as e:
+            print(f"Error fetching sold items: {e}")
+            return []
+
+    def fetch_sold_item_days(self):
+        """Fetch (name, source_price, sold_price, sold_date day number) for every sale, for bulk analytics"""
+        try:
+            self.cursor.execute("SELECT name, source_price, sold_price, sold_date FROM items WHERE status = 'sold'")
+            return self.cursor.fetchall()
+        except sqlite3.Error as e:
+            print(f"Error fetching sold items: {e}")
+            return []
+
+    @staticmethod
+    def _sold_filter(year=None, since=None):
+        conditions = ["status = 'sold'"]
+        params = []
+        if year is not None:
+            conditions.append("sold_date >= ? AND sold_date < ?")
+            params += [to_day_number(f"{int(year):04d}-01-01"), to_day_number(f"{int(year) + 1:04d}-01-01")]
+        if since is not None:
+            conditions.append("sold_date > ?")
+            params.append(to_day_number(since))
+        return " AND ".join(conditions), params
+
+    def iter_item_batches(self, sold_only=False, since=None, batch_size=5000):
+        """Yield lists of item rows (as fetch_items) in id order.
+
+        Rows are read with fetchmany on a cursor of their own, so memory stays
+        flat however large the table is. sold_only and since select the same
+        rows as fetch_sold_items(since=since). Errors are raised rather than
+        printed, since a silently truncated export would look complete.
+        """
+        where, params = self._sold_filter(since=since) if sold_only else ("1", [])
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(
+                f"SELECT {ITEM_COLUMNS} FROM items WHERE {where} ORDER BY id",
+                params
+            )
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield rows
+        finally:
+            cursor.close()
+
+    def fetch_unsold_items(self):
+        """Fetch item rows (as fetch_items) for items still in inventory"""
+        try:
+            self.cursor.execute(
+                f"SELECT {UNSOLD_COLUMNS} FROM items WHERE status = 'unsold' ORDER BY id DESC"
+            )
+            return self.cursor.fetchall()
+        except sqlite3.Error as e:
+            print(f"Error fetching unsold items: {e}")
+            return []
+
+    def search_unsold_items(self, text):
+        """Unsold items whose name contains text (case-insensitive), newest first"""
+        pattern = "%" + text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        try:
+            self.cursor.execute(
+                f"""
+                SELECT {UNSOLD_COLUMNS} FROM items
+                WHERE status = 'unsold' AND name LIKE ? ESCAPE '\\'
+                ORDER BY id DESC
+                """,
+                (pattern,)
+            )
+            return self.cursor.fetchall()
+        except sqlite3.Error as e:
+            print(f"Error searching unsold items: {e}")
+            return []
 
-    def delete_item(self, name, source_price, sold_price, date):
-        self.cursor.execute(
-            "SELECT id FROM items WHERE name=? AND source_price=? AND sold_price=? AND date=? LIMIT 1",
-            (name, source_price, sold_price, date)
+    def fetch_years(self):
+        """Distinct years that have sales (by sale date, as the charts use), newest first"""
+        try:
+            # The 'year' rollup buckets list exactly those years, one row each
+            self.cursor.execute("SELECT bucket FROM sales_rollup WHERE period = 'year' ORDER BY bucket DESC")
+            return [row[0] for row in self.cursor.fetchall()]
+        except sqlite3.Error as e:
+            print(f"Error fetching years: {e}")
+            return []
+
+    # Aggregates. Period sums come from the trigger-maintained rollup tables;
+    # date ranges are half-open comparisons on their bucket keys.
+
+    def _aggregate(self, sql, params, what):
+        try:
+            self.cursor.execute(sql, params)
+            return self.cursor.fetchall()
+        except sqlite3.Error as e:
+            print(f"Error aggregating {what}: {e}")
+            return []
+
+    def has_sales(self):
+        """Whether any item has been sold, without fetching rows"""
+        return self.fetch_totals()["sold_count"] > 0
+
+    def fetch_totals(self):
+        """All-time totals from the rollup table, in constant time"""
+        totals = {"item_count": 0, "cost": 0.0, "sold_count": 0, "sold_cost": 0.0, "revenue": 0.0}
+        try:
+            self.cursor.execute(
+                "SELECT item_count, cost, sold_count, sold_cost, revenue FROM item_totals WHERE id = 1"
+            )
+            row = self.cursor.fetchone()
+            if row:
+                totals = dict(zip(totals, row))
+        except sqlite3.Error as e:
+            print(f"Error fetching totals: {e}")
+        totals["profit"] = totals["revenue"] - totals["sold_cost"]
+        return totals
+
+    def sales_totals_since(self, day):
+        """(revenue, cost, count) for sales dated after the given YYYY-MM-DD day"""
+        rows = self._aggregate(
+            """
+            SELECT COALESCE(SUM(revenue), 0), COALESCE(SUM(cost), 0), COALESCE(SUM(count), 0)
+            FROM sales_rollup WHERE period = 'day' AND bucket > ?
+            """,
+            (day,),
+            "sales since date"
         )
-        result = self.cursor.fetchone()
-        if result:
-            item_id = result[0]
-            self.cursor.execute("DELETE FROM items WHERE id=?", (item_id,))
-            self.conn.commit()
+        return rows[0] if rows else (0.0, 0.0, 0)
+
+    def best_item(self):
+        """(name, profit) of the most profitable sale, or None"""
+        rows = self._aggregate(
+            """
+            SELECT name, sold_price - source_price FROM items
+            WHERE status = 'sold' ORDER BY sold_price - source_price DESC LIMIT 1
+            """,
+            (),
+            "best item"
+        )
+        return rows[0] if rows else None
+
+    def sales_by_day(self, year):
+        """(YYYY-MM-DD, revenue, profit, count) per sale day of a year"""
+        return self._aggregate(
+            """
+            SELECT bucket, revenue, revenue - cost, count FROM sales_rollup
+            WHERE period = 'day' AND bucket >= ? AND bucket < ?
+            ORDER BY bucket
+            """,
+            (f"{int(year):04d}-01-01", f"{int(year) + 1:04d}-01-01"),
+            "daily sales"
+        )
+
+    def sales_by_month(self, year):
+        """(month 1-12, revenue, profit, count) per month of a year that has sales"""
+        return self._aggregate(
+            """
+            SELECT CAST(substr(bucket, 6, 2) AS INTEGER), revenue, revenue - cost, count FROM sales_rollup
+            WHERE period = 'month' AND bucket >= ? AND bucket < ?
+            ORDER BY bucket
+            """,
+            (f"{int(year):04d}-01", f"{int(year) + 1:04d}-01"),
+            "monthly sales"
+        )
+
+    def sales_by_year(self):
+        """(year, revenue, profit, count) per year that has sales"""
+        return self._aggregate(
+            """
+            SELECT CAST(bucket AS INTEGER), revenue, revenue - cost, count FROM sales_rollup
+            WHERE period = 'year'
+            ORDER BY bucket
+            """,
+            (),
+            "annual sales"
+        )
+
+    def rebuild_rollups(self):
+        """Recompute the rollup tables from items"""
+        try:
+            return self.writer.run(_executescript, ROLLUP_REBUILD)
+        except sqlite3.Error as e:
+            print(f"Error rebuilding rollups: {e}")
+            return False
+
+    def update_item(self, item_id, name, source_price, sold_price, date, sold_date=None):
+        """Replace an item's fields; it is a sale if it has a sold price or a sale date, as in insert_item"""
+        try:
+            updated = self._write(
+                _execute,
+                "UPDATE items SET name=?, source_price=?, sold_price=?, date=?, status=?, sold_date=? WHERE id=?",
+                self._item_row(name, source_price, sold_price, date, sold_date) + (item_id,)
+            )
+            return self._changed(updated > 0, "updated", [item_id])
+        except (sqlite3.Error, ValueError) as e:
+            print(f"Error updating item: {e}")
+            return False
+
+    def mark_sold(self, item_id, sold_price, date=None):
+        """Record a sale, dated today unless a YYYY-MM-DD date is given; a price of 0 is a giveaway"""
+        try:
+            day = to_day_number(date) if date is not None else _date.today().toordinal() - _EPOCH_ORDINAL
+            updated = self._write(
+                _execute,
+                "UPDATE items SET status='sold', sold_price=?, sold_date=? WHERE id=?",
+                (sold_price, day, item_id)
+            )
+            return self._changed(updated > 0, "updated", [item_id])
+        except (sqlite3.Error, ValueError) as e:
+            print(f"Error marking item sold: {e}")
+            return False
+
+    def delete_item(self, item_id):
+        try:
+            deleted = self._write(_execute, "DELETE FROM items WHERE id=?", (item_id,))
+            return self._changed(deleted > 0, "deleted", [item_id])
+        except sqlite3.Error as e:
+            print(f"Error deleting item: {e}")
+            return False
+
+    def delete_all_items(self):
+        """Delete every item; the rows are journaled, so undo_last_batch can bring them back"""
+        def delete_all(cursor):
+            self._journal(cursor, "Delete all items")
+            # Reset rollups exactly rather than leaving float residue from the triggers
+            return _executescript(cursor, ["DELETE FROM items"] + ROLLUP_REBUILD)
+
+        try:
+            self.writer.run(delete_all)
+            return self._changed(True, "deleted")
+        except sqlite3.Error as e:
+            print(f"Error deleting all items: {e}")
+            return False
+
+    # Batch edits. Each batch commits as one unit and replaces the undo log
+    # with the before-images of the rows it changes; a later single-item
+    # write clears the log, since undoing past it would overwrite that edit.
+
+    def _write(self, func, *args):
+        """Run a single-item write on the writer, ending the chance to undo the last batch"""
+        def write(cursor):
+            cursor.execute("DELETE FROM undo_log")
+            return func(cursor, *args)
+        return self.writer.run(write)
+
+    @staticmethod
+    def _journal(cursor, label, ids=None):
+        """Replace the undo log with the current rows for ids (every row when None); returns their count"""
+        cursor.execute("DELETE FROM undo_log")
+        insert = """
+            INSERT INTO undo_log (item_id, name, source_price, sold_price, date, status, sold_date, label)
+            SELECT id, name, source_price, sold_price, date, status, sold_date, ? FROM items
+        """
+        if ids is None:
+            cursor.execute(insert, (label,))
+        else:
+            for chunk in _chunks(ids):
+                cursor.execute(f"{insert} WHERE id IN ({_placeholders(chunk)})", [label] + chunk)
+        return cursor.execute("SELECT COUNT(*) FROM undo_log").fetchone()[0]
+
+    @contextmanager
+    def batch(self, label):
+        """Collect edits and commit them together on leaving the block.
+
+            with db.batch("Mark 12 items sold") as batch:
+                for item_id, price in sales:
+                    batch.mark_sold(item_id, price, "2025-06-14")
+
+        Nothing is written if the block raises. Afterwards batch.changed holds
+        the number of items changed, or 0 if the batch failed.
+        """
+        batch = ItemBatch(label)
+        yield batch
+        self.apply_batch(batch)
+
+    def apply_batch(self, batch):
+        """Commit an ItemBatch in one transaction, journaled for undo_last_batch; returns items changed"""
+        def write(cursor):
+            changed = self._journal(cursor, batch.label, batch.updated_ids | batch.deleted_ids)
+            for sql, params in batch.statements:
+                cursor.execute(sql, params)
+            return changed
+
+        if not batch.statements:
+            return 0
+        try:
+            batch.changed = self.writer.run(write)
+        except sqlite3.Error as e:
+            print(f"Error applying batch '{batch.label}': {e}")
+            batch.changed = 0
+            return 0
+
+        updated = batch.updated_ids - batch.deleted_ids
+        if batch.changed and updated:
+            self._changed(True, "updated", sorted(updated, reverse=True))
+        if batch.changed and batch.deleted_ids:
+            self._changed(True, "deleted", sorted(batch.deleted_ids, reverse=True))
+        return batch.changed
+
+    def last_batch_label(self):
+        """Label of the batch undo_last_batch would revert, or None"""
+        try:
+            row = self.cursor.execute("SELECT label FROM undo_log LIMIT 1").fetchone()
+            return row[0] if row else None
+        except sqlite3.Error as e:
+            print(f"Error reading undo log: {e}")
+            return None
+
+    def undo_last_batch(self):
+        """Put back the rows the last batch changed; returns its label, or None if there was nothing to undo"""
+        def undo(cursor):
+            row = cursor.execute("SELECT label FROM undo_log LIMIT 1").fetchone()
+            if row is None:
+                return None
+            # UPDATE and INSERT rather than REPLACE, so the rollup triggers see every
+            # change; a row-value SET rather than UPDATE ... FROM, which needs SQLite 3.33
+            cursor.execute(
+                """
+                UPDATE items SET (name, source_price, sold_price, date, status, sold_date) = (
+                    SELECT name, source_price, sold_price, date, status, sold_date
+                    FROM undo_log WHERE item_id = items.id
+                )
+                WHERE id IN (SELECT item_id FROM undo_log)
+                """
+            )
+            cursor.execute(
+                """
+                INSERT INTO items (id, name, source_price, sold_price, date, status, sold_date)
+                SELECT item_id, name, source_price, sold_price, date, status, sold_date FROM undo_log
+                WHERE item_id NOT IN (SELECT id FROM items)
+                """
+            )
+            cursor.execute("DELETE FROM undo_log")
+            return row[0]
+
+        try:
+            label = self.writer.run(undo)
+        except sqlite3.Error as e:
+            print(f"Error undoing last batch: {e}")
+            return None
+        if label is not None:
+            # Restored rows are not the newest, so views reload instead of patching
+            self._changed(True, "inserted", None)
+        return label
+
+    def close(self):
+        """Finish pending writes, then close the writer, the main connection and every pooled connection"""
+        self.writer.close()
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                break
+        self.conn.close()
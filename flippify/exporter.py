@@ -0,0 +1,128 @@
+import csv
+import os
+import tempfile
+import time
+
+
+EXPORT_COLUMNS = ("id", "name", "source_price", "sold_price", "date", "status", "sold_date")
+EXPORT_FORMATS = (".csv", ".parquet")
+
+
+def write_atomic(filename, save, suffix, before_replace=None):
+    """Call save(path) on a temporary file next to filename, then move it into place.
+
+    before_replace runs between the two and may raise (e.g. a cancelled
+    task's check_cancelled) to discard the file instead of replacing.
+    """
+    write_atomic_all([(filename, save, suffix)], before_replace)
+
+
+def write_atomic_all(files, before_replace=None):
+    """write_atomic for several (filename, save, suffix) files that belong together.
+
+    Every file is written to its temporary name first; none is moved into
+    place unless all of them were saved and before_replace did not raise.
+    """
+    temp_paths = []
+    try:
+        for filename, save, suffix in files:
+            fd, temp_path = tempfile.mkstemp(suffix=suffix, dir=os.path.dirname(os.path.abspath(filename)))
+            os.close(fd)
+            temp_paths.append(temp_path)
+            save(temp_path)
+        if before_replace:
+            before_replace()
+    except BaseException:
+        for temp_path in temp_paths:
+            os.remove(temp_path)
+        raise
+    for (filename, _, _), temp_path in zip(files, temp_paths):
+        os.replace(temp_path, filename)
+
+
+class ItemExporter:
+    """Stream items to .csv or .parquet files.
+
+    Rows are read from the database in fetchmany batches and each batch is
+    written before the next is read, so memory use does not grow with the
+    size of the ledger.
+    """
+
+    def __init__(self, db, batch_size=5000):
+        self.db = db
+        self.batch_size = batch_size
+
+    def expected_rows(self, sold_only=False, since=None):
+        """Row count for progress reporting, read from the maintained totals"""
+        if sold_only and since is not None:
+            return self.db.sales_totals_since(since)[2]
+        totals = self.db.fetch_totals()
+        return totals["sold_count"] if sold_only else totals["item_count"]
+
+    def run(self, path, sold_only=False, since=None, progress=None):
+        """Export items to path and return a summary dict.
+
+        sold_only and since select the sold items dated after a YYYY-MM-DD
+        day, as in the profit report. progress, if given, is called after
+        every batch with the summary so far; an exception raised from it
+        aborts the export and leaves no file behind.
+        """
+        ext = os.path.splitext(path)[1].lower()
+        if ext == ".csv":
+            write = self._write_csv
+        elif ext == ".parquet":
+            write = self._write_parquet
+        else:
+            raise ValueError(f"Unsupported file type: {ext or path}")
+
+        start = time.perf_counter()
+        summary = {"rows": 0, "expected": self.expected_rows(sold_only, since),
+                   "elapsed": 0.0, "rows_per_second": 0.0}
+
+        def batches():
+            for rows in self.db.iter_item_batches(sold_only, since, self.batch_size):
+                yield rows
+                summary["rows"] += len(rows)
+                summary["elapsed"] = time.perf_counter() - start
+                if summary["elapsed"] > 0:
+                    summary["rows_per_second"] = summary["rows"] / summary["elapsed"]
+                if progress:
+                    progress(summary)
+
+        write_atomic(path, lambda temp_path: write(temp_path, batches()), ext + ".tmp")
+        summary["elapsed"] = time.perf_counter() - start
+        return summary
+
+    @staticmethod
+    def _write_csv(path, batches):
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(EXPORT_COLUMNS)
+            for rows in batches:
+                writer.writerows(rows)
+
+    @staticmethod
+    def _write_parquet(path, batches):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Parquet export requires pyarrow (pip install pyarrow)")
+
+        schema = pa.schema([
+            ("id", pa.int64()),
+            ("name", pa.string()),
+            ("source_price", pa.float64()),
+            ("sold_price", pa.float64()),
+            ("date", pa.string()),
+            ("status", pa.string()),
+            ("sold_date", pa.string()),
+        ])
+        # Each batch becomes a row group, written as soon as it is read
+        with pq.ParquetWriter(path, schema) as writer:
+            for rows in batches:
+                columns = list(zip(*rows))
+                writer.write_table(pa.Table.from_arrays(
+                    [pa.array(column, type=field.type) for column, field in zip(columns, schema)],
+                    schema=schema
+                ))
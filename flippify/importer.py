@@ -0,0 +1,189 @@
+import csv
+import itertools
+import math
+import os
+import time
+from datetime import datetime, date
+
+
+# Header spellings accepted for each column, compared lowercased and stripped
+COLUMN_ALIASES = {
+    "name": ("name", "item", "item name"),
+    "source_price": ("source_price", "source price", "source", "cost", "source price (₱)"),
+    "sold_price": ("sold_price", "sold price", "sold", "revenue", "sold price (₱)"),
+    "date": ("date", "date (yyyy-mm-dd)"),
+}
+COLUMNS = ("name", "source_price", "sold_price", "date")
+
+
+def parse_price(value):
+    """Parse a price cell; blank means 0 (unsold)"""
+    if value is None:
+        return 0.0
+    if isinstance(value, (int, float)):
+        return float(value)
+    text = str(value).replace("₱", "").replace(",", "").strip()
+    return float(text) if text else 0.0
+
+
+def parse_date(value):
+    """Normalize a date cell to YYYY-MM-DD"""
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d")
+    if isinstance(value, date):
+        return value.isoformat()
+    text = str(value).strip() if value is not None else ""
+    # Validates the format and rejects impossible dates such as 2024-02-30
+    return datetime.strptime(text[:10], "%Y-%m-%d").strftime("%Y-%m-%d")
+
+
+class ItemImporter:
+    """Bulk-load items from .xlsx or .csv files.
+
+    Rows are streamed from the file, validated and deduplicated in chunks,
+    and each chunk is written with a single executemany in one transaction.
+    """
+
+    def __init__(self, db, chunk_size=5000):
+        self.db = db
+        self.chunk_size = chunk_size
+
+    def read_rows(self, path):
+        """Yield raw row tuples from a CSV or Excel file"""
+        ext = os.path.splitext(path)[1].lower()
+        if ext in (".xlsx", ".xlsm"):
+            try:
+                from openpyxl import load_workbook
+            except ImportError:
+                raise RuntimeError("Excel import requires openpyxl (pip install openpyxl)")
+
+            # read_only mode streams rows instead of loading the whole sheet
+            workbook = load_workbook(path, read_only=True, data_only=True)
+            try:
+                for row in workbook.active.iter_rows(values_only=True):
+                    yield row
+            finally:
+                workbook.close()
+        elif ext == ".csv":
+            with open(path, newline="", encoding="utf-8-sig") as f:
+                for row in csv.reader(f):
+                    yield tuple(row)
+        else:
+            raise ValueError(f"Unsupported file type: {ext or path}")
+
+    def map_columns(self, header):
+        """Return column positions from a header row, or None if it is not a header"""
+        labels = [str(cell).strip().lower() if cell is not None else "" for cell in header]
+        positions = {}
+        for column, aliases in COLUMN_ALIASES.items():
+            for i, label in enumerate(labels):
+                if label in aliases:
+                    positions[column] = i
+                    break
+        if "name" in positions and "source_price" in positions:
+            return positions
+        return None
+
+    def run(self, path, progress=None, before_write=None):
+        """Import a file and return a summary dict.
+
+        progress, if given, is called after every chunk with the summary so far.
+        before_write is called before each chunk is written and may raise to
+        stop the import without writing that chunk.
+        Once anything was inserted the rollups are rebuilt, even if progress
+        stopped the import by raising.
+        """
+        start = time.perf_counter()
+        summary = {"read": 0, "inserted": 0, "duplicates": 0, "invalid": 0, "errors": [],
+                   "elapsed": 0.0, "rows_per_second": 0.0}
+
+        # One query up front replaces a SELECT per imported row
+        existing = self.db.fetch_item_keys()
+
+        rows = self.read_rows(path)
+        first = next(rows, None)
+        if first is None:
+            return summary
+
+        positions = self.map_columns(first)
+        if positions is None:
+            # No header; assume the file uses the app's column order
+            positions = {column: i for i, column in enumerate(COLUMNS)}
+            rows = itertools.chain([first], rows)
+            first_line = 1
+        else:
+            first_line = 2
+
+        try:
+            chunk = []
+            for line, row in enumerate(rows, start=first_line):
+                if all(value in (None, "") for value in row):
+                    continue  # blank spreadsheet row
+                summary["read"] += 1
+
+                record = self._validate(row, positions, line, summary)
+                if record is None:
+                    continue
+                if record in existing:
+                    summary["duplicates"] += 1
+                    continue
+                existing.add(record)
+
+                chunk.append(record)
+                if len(chunk) >= self.chunk_size:
+                    self._write_chunk(chunk, summary, start, progress, before_write)
+                    chunk = []
+
+            self._write_chunk(chunk, summary, start, progress, before_write)
+        finally:
+            if summary["inserted"]:
+                self.db.rebuild_rollups()
+        return summary
+
+    def _validate(self, row, positions, line, summary):
+        def cell(column):
+            i = positions.get(column)
+            return row[i] if i is not None and i < len(row) else None
+
+        name = cell("name")
+        name = str(name).strip() if name is not None else ""
+        if not name:
+            self._reject(summary, line, "missing item name")
+            return None
+
+        try:
+            source = parse_price(cell("source_price"))
+            sold = parse_price(cell("sold_price"))
+        except ValueError:
+            self._reject(summary, line, "invalid price")
+            return None
+        if not (math.isfinite(source) and math.isfinite(sold)) or source < 0 or sold < 0:
+            self._reject(summary, line, "price out of range")
+            return None
+
+        raw_date = cell("date")
+        try:
+            item_date = parse_date(raw_date) if raw_date not in (None, "") else date.today().isoformat()
+        except ValueError:
+            self._reject(summary, line, f"invalid date {raw_date!r}")
+            return None
+
+        return name, source, sold, item_date
+
+    @staticmethod
+    def _reject(summary, line, reason):
+        summary["invalid"] += 1
+        # Keep the report readable on badly formatted files
+        if len(summary["errors"]) < 50:
+            summary["errors"].append(f"Row {line}: {reason}")
+
+    def _write_chunk(self, chunk, summary, start, progress, before_write):
+        if chunk:
+            if before_write:
+                before_write()
+            summary["inserted"] += self.db.insert_items(chunk, check_duplicates=False)
+        summary["elapsed"] = time.perf_counter() - start
+        if summary["elapsed"] > 0:
+            summary["rows_per_second"] = summary["read"] / summary["elapsed"]
+        if progress:
+            progress(summary)
@@ -1,13 +1,20 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 from datetime import datetime
-from database import DatabaseManager
+from database import DatabaseManager, DATE_FORMAT
+from tasks import TaskExecutor
+
+
+# Pause in typing before the inventory search runs
+SEARCH_DELAY_MS = 200
 
 
 class InventoryTab(ttk.Frame):
-    def __init__(self, parent):
+    def __init__(self, parent, db=None, tasks=None):
         super().__init__(parent)
-        self.db = DatabaseManager()
+        self.db = db if db is not None else DatabaseManager()
+        self.tasks = tasks if tasks is not None else TaskExecutor(self)
+        self.search_task = None
         self.pack(fill="both", expand=True)
 
         # Header section with title and search
@@ -34,8 +41,21 @@ class InventoryTab(ttk.Frame):
         search_entry.bind("<FocusOut>", self.on_search_focus_out)
         self.search_entry = search_entry
 
+        self.unsold_items = []
+        self.list_offset = 0
+
+        # Search state: pending debounce timer and the query behind unsold_items
+        self.search_after_id = None
+        self.last_query = None
+        self.row_widgets = []
+        self.build_list_view()
+
         self.build_inventory_list()
 
+        # Writes made anywhere in the app are applied to the list as they happen
+        self.db.subscribe(self.apply_change)
+        self.bind("<Destroy>", lambda e: self.db.unsubscribe(self.apply_change))
+
     def on_search_focus_in(self, event):
         """Clear placeholder text when search box is focused"""
         if self.search_entry.get() == "🔍 Search items...":
@@ -47,54 +67,176 @@ class InventoryTab(ttk.Frame):
             self.search_entry.insert(0, "🔍 Search items...")
 
     def on_search(self, *args):
-        """Called when search text changes"""
+        """Called when search text changes; waits for a pause in typing before querying"""
         if self.search_var.get() != "🔍 Search items...":
-            self.build_inventory_list()
+            if self.search_after_id is not None:
+                self.after_cancel(self.search_after_id)
+            self.search_after_id = self.after(SEARCH_DELAY_MS, self.run_search)
+
+    def get_search_text(self):
+        search_text = self.search_var.get().strip().lower()
+        return "" if search_text == "🔍 search items..." else search_text
+
+    def build_list_view(self):
+        """Create the list area once; rows are recycled as the user scrolls"""
+        content_frame = ttk.Frame(self)
+        content_frame.pack(fill="both", expand=True, padx=20, pady=(0, 20))
+
+        self.list_scrollbar = ttk.Scrollbar(content_frame, orient="vertical", command=self.on_list_scroll)
+        self.list_scrollbar.pack(side="right", fill="y")
+
+        self.rows_frame = ttk.Frame(content_frame)
+        self.rows_frame.pack(side="left", fill="both", expand=True)
+        # Size comes from the window, not from how many rows are packed
+        self.rows_frame.pack_propagate(False)
+        self.rows_frame.bind("<Configure>", self.on_list_resize)
+        self.rows_frame.bind("<MouseWheel>", self.on_list_mousewheel)
+
+        self.empty_label = ttk.Label(self.rows_frame, text="", font=("Segoe UI", 12), foreground="gray")
+
+        # Start with a screenful; on_list_resize adds more if the window grows
+        for _ in range(12):
+            self.add_row_widget()
+
+    def add_row_widget(self):
+        row = ttk.Frame(self.rows_frame)
+        label = ttk.Label(row, text="", font=("Segoe UI", 11))
+        label.pack(side="left", expand=True, anchor="w")
+
+        # Sold button with better styling
+        sold_btn = ttk.Button(row, text="Mark as Sold")
+        sold_btn.pack(side="right", padx=(10, 0))
+
+        for widget in (row, label, sold_btn):
+            widget.bind("<MouseWheel>", self.on_list_mousewheel)
+        self.row_widgets.append((row, label, sold_btn))
 
     def build_inventory_list(self):
-        # Remove existing inventory frame
-        for widget in self.winfo_children():
-            if isinstance(widget, ttk.Frame) and widget != self.winfo_children()[0]:  # Keep header frame
-                widget.destroy()
+        """Reload the unsold items matching the search from the database and redraw the list"""
+        self.last_query = None
+        self.run_search()
 
-        data = self.db.fetch_items()
-        unsold_items = [item for item in data if item[2] == 0.0]  # sold_price == 0
+    def run_search(self):
+        self.search_after_id = None
+        search_text = self.get_search_text()
+        if search_text == self.last_query:
+            return
 
-        # Filter items based on search text
-        search_text = self.search_var.get().lower()
-        if search_text and search_text != "🔍 search items...":
-            unsold_items = [item for item in unsold_items if search_text in item[0].lower()]
+        if self.search_task is not None:
+            self.search_task.cancel()
+            self.search_task = None
 
-        # Main content area
-        content_frame = ttk.Frame(self)
-        content_frame.pack(fill="both", expand=True, padx=20, pady=(0, 20))
+        if self.last_query and search_text.startswith(self.last_query):
+            # The query only grew, so its matches are a subset of the current ones
+            self.show_results(search_text, [item for item in self.unsold_items if search_text in item[1].lower()])
+        else:
+            self.search_task = self.tasks.submit(
+                self.query_items, search_text,
+                on_done=lambda items: self.show_results(search_text, items), owner=self
+            )
 
-        if not unsold_items:
-            empty_frame = ttk.Frame(content_frame)
-            empty_frame.pack(expand=True)
-            if search_text and search_text != "🔍 search items...":
-                ttk.Label(empty_frame, text=f"No items found matching '{search_text}'",
-                          font=("Segoe UI", 12), foreground="gray").pack(pady=50)
-            else:
-                ttk.Label(empty_frame, text="No unsold items in inventory",
-                          font=("Segoe UI", 12), foreground="gray").pack(pady=50)
+    def query_items(self, search_text):
+        """Worker: unsold items matching the search text"""
+        with self.db.worker_session() as db:
+            if search_text:
+                return db.search_unsold_items(search_text)
+            return db.fetch_unsold_items()
+
+    def show_results(self, search_text, unsold_items):
+        self.search_task = None
+        # Results for text the user has since changed are stale
+        if search_text != self.get_search_text():
             return
+        self.unsold_items = unsold_items
+        self.last_query = search_text
+        self.list_offset = 0
+        self.render_rows()
+
+    def apply_change(self, change):
+        """Data change listener: patch unsold_items in memory instead of querying again"""
+        if change.ids is None or self.search_task is not None:
+            # Bulk change, or a search in flight whose results would miss the change
+            self.build_inventory_list()
+            return
+
+        changed = set(change.ids)
+        items = [item for item in self.unsold_items if item[0] not in changed]
+        if change.kind != "deleted":
+            # Changed rows that are (still) unsold and match the current search
+            query = self.last_query or ""
+            items += [row for row in self.db.fetch_items_by_id(changed)
+                      if row[5] == "unsold" and query in row[1].lower()]
+            items.sort(key=lambda item: item[0], reverse=True)
+        self.unsold_items = items
+        self.render_rows()
+
+    def render_rows(self):
+        """Fill the recycled row widgets with the items from list_offset onwards"""
+        total = len(self.unsold_items)
+        self.list_offset = min(max(0, self.list_offset), max(0, total - len(self.row_widgets)))
+
+        if not self.unsold_items:
+            search_text = self.get_search_text()
+            if search_text:
+                self.empty_label.config(text=f"No items found matching '{search_text}'")
+            else:
+                self.empty_label.config(text="No unsold items in inventory")
+            self.empty_label.pack(pady=50)
+        else:
+            self.empty_label.pack_forget()
+
+        for i, (row, label, sold_btn) in enumerate(self.row_widgets):
+            index = self.list_offset + i
+            if index < total:
+                item = self.unsold_items[index]
+                _, name, source, _, date, _, _ = item
+
+                # Item info
+                label.config(text=f"{name} • ₱{source:.2f} • {date}")
+                sold_btn.config(command=lambda i=item: self.open_sold_popup(i))
 
-        # Items list with cleaner styling
-        for i, item in enumerate(unsold_items):
-            row = ttk.Frame(content_frame)
-            row.pack(fill="x", pady=2)
+                # Shown rows are always a prefix, so re-packing keeps their order
+                if not row.winfo_manager():
+                    row.pack(fill="x", pady=2)
+            elif row.winfo_manager():
+                row.pack_forget()
 
-            name, source, sold, date = item
+        if total:
+            shown = min(len(self.row_widgets), total - self.list_offset)
+            self.list_scrollbar.set(self.list_offset / total, (self.list_offset + shown) / total)
+        else:
+            self.list_scrollbar.set(0, 1)
 
-            # Item info
-            info_text = f"{name} • ₱{source:.2f} • {date}"
-            ttk.Label(row, text=info_text, font=("Segoe UI", 11)).pack(side="left", expand=True, anchor="w")
+    def on_list_scroll(self, *args):
+        """Scrollbar command: ('moveto', fraction) or ('scroll', n, 'units'|'pages')"""
+        if args[0] == "moveto":
+            self.list_offset = int(float(args[1]) * len(self.unsold_items))
+        elif args[0] == "scroll":
+            step = len(self.row_widgets) if args[2] == "pages" else 1
+            self.list_offset += int(args[1]) * step
+        self.render_rows()
 
-            # Sold button with better styling
-            sold_btn = ttk.Button(row, text="Mark as Sold",
-                                  command=lambda i=item: self.open_sold_popup(i))
-            sold_btn.pack(side="right", padx=(10, 0))
+    def on_list_mousewheel(self, event):
+        self.list_offset += -3 if event.delta > 0 else 3
+        self.render_rows()
+        return "break"
+
+    def on_list_resize(self, event):
+        """Keep exactly enough row widgets to fill the visible area"""
+        if not self.row_widgets:
+            return
+        row_height = max(self.row_widgets[0][0].winfo_reqheight(), 1) + 4  # pady=2 on each side
+        needed = max(1, event.height // row_height)
+        if needed > len(self.row_widgets):
+            while len(self.row_widgets) < needed:
+                self.add_row_widget()
+        elif needed < len(self.row_widgets):
+            for row, _, _ in self.row_widgets[needed:]:
+                row.destroy()
+            del self.row_widgets[needed:]
+        else:
+            return
+        self.render_rows()
 
     def open_sold_popup(self, item):
         popup = tk.Toplevel(self)
@@ -102,7 +244,9 @@ class InventoryTab(ttk.Frame):
         popup.geometry("300x180")
         popup.transient(self)
 
-        ttk.Label(popup, text=f"Item: {item[0]}", font=("Segoe UI", 12)).pack(pady=10)
+        item_id, name = item[0], item[1]
+
+        ttk.Label(popup, text=f"Item: {name}", font=("Segoe UI", 12)).pack(pady=10)
 
         sold_price_var = tk.StringVar()
         sold_date_var = tk.StringVar(value=datetime.today().strftime("%Y-%m-%d"))
@@ -116,15 +260,17 @@ class InventoryTab(ttk.Frame):
         def save_sold():
             try:
                 sold_price = float(sold_price_var.get())
+                if sold_price < 0:
+                    raise ValueError
                 sold_date = sold_date_var.get()
-                datetime.strptime(sold_date, "%Y-%m-%d")
+                datetime.strptime(sold_date, DATE_FORMAT)
             except ValueError:
                 messagebox.showerror("Error", "Invalid sold price or date.")
                 return
 
-            self.db.delete_item(*item)
-            self.db.insert_item(item[0], item[1], sold_price, sold_date)
+            if not self.db.mark_sold(item_id, sold_price, sold_date):
+                messagebox.showerror("Error", "Failed to update item. Please try again.")
+                return
             popup.destroy()
-            self.build_inventory_list()
 
         ttk.Button(popup, text="✅ Mark as Sold", command=save_sold).pack(pady=10)
\ No newline at end of file
@@ -0,0 +1,101 @@
+import threading
+import numpy as np
+from analytics import PRICE_RANGES
+
+
+# Column arrays behind the per-item analytics. Kept apart from analytics so
+# that importing analytics (as the profit report does) does not load NumPy.
+
+
+class ItemSnapshot:
+    """Column arrays of the sold items, for vectorized per-item metrics.
+
+    Prices are float64 arrays, dates a datetime64[D] array taken straight
+    from the stored day numbers, and names are stored once in `names` with
+    an integer code per row. Build it through snapshot(db), which keeps one
+    per data generation.
+    """
+
+    def __init__(self, rows):
+        """rows are (name, source_price, sold_price, day number) tuples"""
+        count = len(rows)
+        self.names, self.name_codes = np.unique([row[0] for row in rows], return_inverse=True)
+        self.cost = np.fromiter((row[1] for row in rows), dtype=np.float64, count=count)
+        self.sold = np.fromiter((row[2] for row in rows), dtype=np.float64, count=count)
+        # Day numbers count from 1970-01-01, which is also datetime64's epoch
+        self.date = np.fromiter((row[3] for row in rows), dtype=np.int64, count=count).astype("datetime64[D]")
+
+        self.profit = self.sold - self.cost
+        self.roi = np.divide(self.profit * 100, self.cost, out=np.zeros(count), where=self.cost > 0)
+        self.margin = np.divide(self.profit * 100, self.sold, out=np.zeros(count), where=self.sold > 0)
+
+    def __len__(self):
+        return len(self.cost)
+
+    def year_mask(self, year):
+        """Rows dated within a calendar year"""
+        return ((self.date >= np.datetime64(f"{int(year):04d}-01-01"))
+                & (self.date < np.datetime64(f"{int(year) + 1:04d}-01-01")))
+
+    def since_mask(self, day):
+        """Rows dated after a YYYY-MM-DD day"""
+        return self.date > np.datetime64(day)
+
+    def top(self, by="profit", n=10, mask=None):
+        """Row indices of the n largest values of a column, largest first.
+
+        argpartition finds the n candidates in linear time, so only they are sorted.
+        """
+        values = getattr(self, by)
+        indices = np.arange(len(values)) if mask is None else np.flatnonzero(mask)
+        if len(indices) > n:
+            indices = indices[np.argpartition(values[indices], -n)[-n:]]
+        return indices[np.argsort(values[indices], kind="stable")[::-1]]
+
+    def rows(self, indices):
+        """(name, cost, sold, profit, roi, margin) tuples for the given row indices"""
+        return [
+            (str(self.names[self.name_codes[i]]), float(self.cost[i]), float(self.sold[i]),
+             float(self.profit[i]), float(self.roi[i]), float(self.margin[i]))
+            for i in indices
+        ]
+
+    def monthly_profit(self, mask=None):
+        """Profit per month number (1-12) of the rows in mask"""
+        dates = self.date if mask is None else self.date[mask]
+        profit = self.profit if mask is None else self.profit[mask]
+        months = dates.astype("datetime64[M]").astype(np.int64) % 12
+        totals = np.bincount(months, weights=profit, minlength=12)
+        return {m + 1: float(total) for m, total in enumerate(totals)}
+
+    def price_distribution(self, mask=None):
+        """Count of sold prices per PRICE_RANGES bucket"""
+        prices = self.sold if mask is None else self.sold[mask]
+        edges = [upper for _, upper in PRICE_RANGES if upper is not None]
+        # side="left" puts a price equal to an upper bound in that bucket, as in "₱0-100"
+        buckets = np.searchsorted(edges, prices, side="left")
+        return np.bincount(buckets, minlength=len(PRICE_RANGES)).tolist()
+
+    def histogram(self, column, bins=15, mask=None):
+        """(counts, edges) of a column, as numpy.histogram"""
+        values = getattr(self, column)
+        return np.histogram(values if mask is None else values[mask], bins=bins)
+
+
+# One snapshot per database file, rebuilt when its data generation changes
+_snapshots = {}
+_snapshots_lock = threading.Lock()
+
+
+def snapshot(db):
+    """The ItemSnapshot for db's current data, loading it on first use after a write"""
+    key = (db.db_name, db.generation)
+    with _snapshots_lock:
+        cached = _snapshots.get(db.db_name)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+
+    snap = ItemSnapshot(db.fetch_sold_item_days())
+    with _snapshots_lock:
+        _snapshots[db.db_name] = (key, snap)
+    return snap
@@ -1,17 +1,35 @@
 import tkinter as tk
-from tkinter import ttk, messagebox, simpledialog
+from tkinter import ttk, messagebox, simpledialog, filedialog
 from datetime import datetime
-import sqlite3
-from database import DatabaseManager
+from database import DatabaseManager, DATE_FORMAT
+from importer import ItemImporter
+from exporter import ItemExporter
+from tasks import TaskExecutor
 
 
 class ItemTracker(ttk.Frame):
-    def __init__(self, parent):
+    def __init__(self, parent, db=None, tasks=None):
         super().__init__(parent)
-        self.db = DatabaseManager()
+        self.db = db if db is not None else DatabaseManager()
+        self.tasks = tasks if tasks is not None else TaskExecutor(self)
+        self.load_task = None
+        self.export_task = None
+        self.import_task = None
+        self.items_by_id = {}
+        # Selected item ids, including rows since scrolled out of the page
+        self.selected_ids = set()
+
+        # Virtual list state: only page_size rows starting at page_offset live in the Treeview
+        self.page_offset = 0
+        self.page_size = 15
+        self.total_rows = 0
         self.configure(padding=0)
         self.build_modern_ui()
 
+        # Writes made anywhere in the app are applied to this view as they happen
+        self.db.subscribe(self.apply_change)
+        self.bind("<Destroy>", lambda e: self.db.unsubscribe(self.apply_change))
+
     def build_modern_ui(self):
         # Header section
         header_frame = ttk.Frame(self)
@@ -116,25 +134,14 @@ class ItemTracker(ttk.Frame):
         stats_frame = ttk.LabelFrame(parent, text="Quick Stats", padding=20)
         stats_frame.pack(fill="x", pady=10)
 
-        data = self.db.fetch_items()
-
-        total_items = len(data)
-        sold_items = len([item for item in data if item[2] > 0])
-        unsold_items = total_items - sold_items
-        total_profit = sum(item[2] - item[1] for item in data if item[2] > 0)
-
-        stats_text = f"📊 Total Items: {total_items}\n"
-        stats_text += f"✅ Sold: {sold_items}\n"
-        stats_text += f"📦 Unsold: {unsold_items}\n"
-        stats_text += f"💰 Total Profit: ₱{total_profit:.2f}"
-
-        stats_label = ttk.Label(
+        # Filled in by refresh_stats once the totals are loaded
+        self.stats_label = ttk.Label(
             stats_frame,
-            text=stats_text,
+            text="",
             font=("Segoe UI", 10),
             justify="left"
         )
-        stats_label.pack(anchor="w")
+        self.stats_label.pack(anchor="w")
 
     def build_modern_list(self, parent):
         # List header
@@ -155,6 +162,25 @@ class ItemTracker(ttk.Frame):
         )
         refresh_btn.pack(side="right")
 
+        # Import button
+        self.import_btn = ttk.Button(
+            list_header,
+            text="📥 Import",
+            command=self.import_items
+        )
+        self.import_btn.pack(side="right", padx=(0, 10))
+
+        # Export button
+        self.export_btn = ttk.Button(
+            list_header,
+            text="📤 Export",
+            command=self.export_items
+        )
+        self.export_btn.pack(side="right", padx=(0, 10))
+
+        self.import_status = ttk.Label(list_header, text="", font=("Segoe UI", 9), foreground="#888888")
+        self.import_status.pack(side="right", padx=(0, 10))
+
         # Modern treeview container
         tree_container = ttk.LabelFrame(parent, text="Inventory List", padding=15)
         tree_container.pack(fill="both", expand=True)
@@ -177,11 +203,25 @@ class ItemTracker(ttk.Frame):
             self.tree.heading(col, text=heading)
             self.tree.column(col, width=width, minwidth=60)
 
-        # Scrollbars
-        v_scrollbar = ttk.Scrollbar(tree_container, orient="vertical", command=self.tree.yview)
+        # Scrollbars. The vertical one spans the whole ledger and pages rows in from
+        # the database instead of scrolling the Treeview's own contents.
+        v_scrollbar = ttk.Scrollbar(tree_container, orient="vertical", command=self.on_virtual_scroll)
         h_scrollbar = ttk.Scrollbar(tree_container, orient="horizontal", command=self.tree.xview)
-
-        self.tree.configure(yscrollcommand=v_scrollbar.set, xscrollcommand=h_scrollbar.set)
+        self.v_scrollbar = v_scrollbar
+
+        self.tree.configure(xscrollcommand=h_scrollbar.set)
+
+        self.tree.bind("<Configure>", self.on_tree_resize)
+        self.tree.bind("<MouseWheel>", self.on_tree_mousewheel)
+        self.tree.bind("<Button-4>", lambda e: self.scroll_rows(-3))
+        self.tree.bind("<Button-5>", lambda e: self.scroll_rows(3))
+        self.tree.bind("<Up>", self.on_tree_arrow)
+        self.tree.bind("<Down>", self.on_tree_arrow)
+        self.tree.bind("<<TreeviewSelect>>", self.on_tree_select)
+        # A plain click starts a new selection; Ctrl/Shift clicks extend it
+        self.tree.bind("<Button-1>", self.forget_offpage_selection)
+        self.tree.bind("<Control-Button-1>", lambda e: None)
+        self.tree.bind("<Shift-Button-1>", lambda e: None)
 
         # Pack scrollbars and treeview
         self.tree.pack(side="left", fill="both", expand=True)
@@ -200,8 +240,11 @@ class ItemTracker(ttk.Frame):
         self.context_menu.add_command(label="🗑️ Delete Item", command=self.delete_selected_item)
         self.context_menu.add_separator()
         self.context_menu.add_command(label="💰 Mark as Sold", command=self.mark_as_sold)
+        self.context_menu.add_separator()
+        self.context_menu.add_command(label="↩️ Undo Last Batch", command=self.undo_last_batch)
 
         self.tree.bind("<Button-3>", self.show_context_menu)
+        self.tree.bind("<Control-z>", lambda e: self.undo_last_batch())
 
     def show_context_menu(self, event):
         if self.tree.selection():
@@ -213,24 +256,23 @@ class ItemTracker(ttk.Frame):
         if not selection:
             return None
 
-        item = selection[0]
-        values = self.tree.item(item, 'values')
+        # Treeview iids are the database row ids
+        item_id = int(selection[0])
+        row = self.items_by_id.get(item_id)
 
-        if not values:
+        if not row:
             return None
 
-        # Extract data from the tree view values
-        name = values[0]
-        source_price = float(values[1].replace('₱', '').replace(',', ''))
-        sold_price_str = values[2]
-        sold_price = 0.0 if sold_price_str == '-' else float(sold_price_str.replace('₱', '').replace(',', ''))
-        date = values[3]
+        _, name, source_price, sold_price, date, status, sold_date = row
 
         return {
+            'id': item_id,
             'name': name,
             'source_price': source_price,
             'sold_price': sold_price,
-            'date': date
+            'date': date,
+            'status': status,
+            'sold_date': sold_date
         }
 
     def edit_selected_item(self):
@@ -242,7 +284,7 @@ class ItemTracker(ttk.Frame):
         # Create edit dialog
         edit_window = tk.Toplevel(self)
         edit_window.title("Edit Item")
-        edit_window.geometry("400x450")
+        edit_window.geometry("400x520")
         edit_window.resizable(False, False)
         edit_window.grab_set()  # Make it modal
 
@@ -252,8 +294,10 @@ class ItemTracker(ttk.Frame):
         # Variables for edit form
         edit_name = tk.StringVar(value=item_data['name'])
         edit_source = tk.StringVar(value=str(item_data['source_price']))
-        edit_sold = tk.StringVar(value=str(item_data['sold_price']) if item_data['sold_price'] > 0 else "")
+        is_sold = item_data['status'] == "sold"
+        edit_sold = tk.StringVar(value=str(item_data['sold_price']) if is_sold else "")
         edit_date = tk.StringVar(value=item_data['date'])
+        edit_sold_date = tk.StringVar(value=item_data['sold_date'] or "")
 
         # Edit form
         main_frame = ttk.Frame(edit_window, padding=20)
@@ -266,7 +310,8 @@ class ItemTracker(ttk.Frame):
             ("Item Name:", edit_name),
             ("Source Price (₱):", edit_source),
             ("Sold Price (₱):", edit_sold),
-            ("Date (YYYY-MM-DD):", edit_date)
+            ("Date (YYYY-MM-DD):", edit_date),
+            ("Date Sold (YYYY-MM-DD, empty if unsold):", edit_sold_date)
         ]
 
         entries = []
@@ -288,6 +333,7 @@ class ItemTracker(ttk.Frame):
             new_source = edit_source.get().strip()
             new_sold = edit_sold.get().strip()
             new_date = edit_date.get().strip()
+            new_sold_date = edit_sold_date.get().strip() or None
 
             # Validation
             if not new_name:
@@ -301,25 +347,28 @@ class ItemTracker(ttk.Frame):
                 messagebox.showerror("Error", "Prices must be valid numbers.")
                 return
 
+            if new_source_price < 0 or new_sold_price < 0:
+                messagebox.showerror("Error", "Prices cannot be negative.")
+                return
+
             if not new_date:
                 messagebox.showerror("Error", "Date is required.")
                 return
 
             try:
-                datetime.strptime(new_date, "%Y-%m-%d")
+                datetime.strptime(new_date, DATE_FORMAT)
+                if new_sold_date:
+                    datetime.strptime(new_sold_date, DATE_FORMAT)
             except ValueError:
                 messagebox.showerror("Error", "Date must be in YYYY-MM-DD format.")
                 return
 
-            # Update in database
-            success = self.db.update_item(
-                item_data['name'], item_data['source_price'], item_data['sold_price'], item_data['date'],
-                new_name, new_source_price, new_sold_price, new_date
-            )
+            # Update in database; a sale date without a price records a giveaway
+            success = self.db.update_item(item_data['id'], new_name, new_source_price, new_sold_price,
+                                          new_date, new_sold_date)
 
             if success:
                 edit_window.destroy()
-                self.load_items()
                 messagebox.showinfo("Success", f"Item '{new_name}' updated successfully!")
             else:
                 messagebox.showerror("Error", "Failed to update item. Please try again.")
@@ -331,7 +380,24 @@ class ItemTracker(ttk.Frame):
         ttk.Button(button_frame, text="💾 Save Changes", command=save_changes).pack(side="left", padx=(0, 10))
         ttk.Button(button_frame, text="❌ Cancel", command=cancel_edit).pack(side="left")
 
+    def on_tree_select(self, event=None):
+        """Mirror the selection on the page into selected_ids, keeping off-page ids"""
+        self.selected_ids -= set(self.items_by_id)
+        self.selected_ids.update(int(iid) for iid in self.tree.selection())
+
+    def forget_offpage_selection(self, event=None):
+        self.selected_ids &= set(self.items_by_id)
+
+    def get_selected_rows(self):
+        """Rows of every selected item, on this page or scrolled out of it"""
+        return self.db.fetch_items_by_id(self.selected_ids)
+
     def delete_selected_item(self):
+        rows = self.get_selected_rows()
+        if len(rows) > 1:
+            self.delete_selected_items(rows)
+            return
+
         item_data = self.get_selected_item_data()
         if not item_data:
             messagebox.showwarning("Warning", "Please select an item to delete.")
@@ -340,27 +406,37 @@ class ItemTracker(ttk.Frame):
         # Confirm deletion
         confirm_msg = f"Are you sure you want to delete '{item_data['name']}'?\n\nThis action cannot be undone."
         if messagebox.askyesno("Confirm Delete", confirm_msg):
-            success = self.db.delete_item(
-                item_data['name'],
-                item_data['source_price'],
-                item_data['sold_price'],
-                item_data['date']
-            )
+            success = self.db.delete_item(item_data['id'])
 
             if success:
-                self.load_items()
                 messagebox.showinfo("Success", f"Item '{item_data['name']}' deleted successfully!")
             else:
                 messagebox.showerror("Error", "Failed to delete item. Please try again.")
 
+    def delete_selected_items(self, rows):
+        """Delete several items in one batch, which Undo Last Batch can restore"""
+        if not messagebox.askyesno("Confirm Delete", f"Delete {len(rows)} items?\n\nUse Undo Last Batch to restore them."):
+            return
+
+        with self.db.batch(f"Delete {len(rows)} items") as batch:
+            for row in rows:
+                batch.delete(row[0])
+        if not batch.changed:
+            messagebox.showerror("Error", "Failed to delete items. Please try again.")
+
     def mark_as_sold(self):
+        rows = self.get_selected_rows()
+        if len(rows) > 1:
+            self.mark_selected_sold(rows)
+            return
+
         item_data = self.get_selected_item_data()
         if not item_data:
             messagebox.showwarning("Warning", "Please select an item to mark as sold.")
             return
 
         # Check if already sold
-        if item_data['sold_price'] > 0:
+        if item_data['status'] == "sold":
             messagebox.showinfo("Info", "This item is already marked as sold.")
             return
 
@@ -368,31 +444,60 @@ class ItemTracker(ttk.Frame):
         sold_price = simpledialog.askfloat(
             "Mark as Sold",
             f"Enter the sold price for '{item_data['name']}':",
-            minvalue=0.01,
+            minvalue=0,
             initialvalue=item_data['source_price'] * 1.2  # Suggest 20% markup
         )
 
         if sold_price is None:  # User cancelled
             return
 
-        if sold_price <= 0:
-            messagebox.showerror("Error", "Sold price must be greater than 0.")
+        if sold_price < 0:
+            messagebox.showerror("Error", "Sold price cannot be negative.")
             return
 
         # Update in database
-        success = self.db.update_item(
-            item_data['name'], item_data['source_price'], item_data['sold_price'], item_data['date'],
-            item_data['name'], item_data['source_price'], sold_price, item_data['date']
-        )
+        success = self.db.mark_sold(item_data['id'], sold_price)
 
         if success:
-            self.load_items()
             profit = sold_price - item_data['source_price']
             profit_msg = f"Profit: ₱{profit:.2f}" if profit > 0 else f"Loss: ₱{abs(profit):.2f}"
             messagebox.showinfo("Success", f"Item '{item_data['name']}' marked as sold!\n{profit_msg}")
         else:
             messagebox.showerror("Error", "Failed to update item. Please try again.")
 
+    def mark_selected_sold(self, rows):
+        """Mark several items sold today in one batch, priced at a markup over their source price"""
+        unsold = [row for row in rows if row[5] == "unsold"]
+        if not unsold:
+            messagebox.showinfo("Info", "The selected items are already marked as sold.")
+            return
+
+        markup = simpledialog.askfloat(
+            "Mark as Sold",
+            f"Markup over source price for the {len(unsold)} unsold items (%):",
+            minvalue=-100,
+            initialvalue=20
+        )
+        if markup is None:  # User cancelled
+            return
+
+        with self.db.batch(f"Mark {len(unsold)} items sold") as batch:
+            for row in unsold:
+                batch.mark_sold(row[0], round(row[2] * (1 + markup / 100), 2))
+        if batch.changed:
+            messagebox.showinfo("Success", f"{batch.changed} items marked as sold.")
+        else:
+            messagebox.showerror("Error", "Failed to update items. Please try again.")
+
+    def undo_last_batch(self):
+        label = self.db.last_batch_label()
+        if label is None:
+            messagebox.showinfo("Undo", "There is no batch edit to undo.")
+            return
+        if messagebox.askyesno("Undo", f"Undo '{label}'?"):
+            if self.db.undo_last_batch() is None:
+                messagebox.showerror("Error", "Failed to undo. Please try again.")
+
     def add_item(self):
         name = self.name_var.get().strip()
         source_price = self.source_var.get().strip()
@@ -411,22 +516,130 @@ class ItemTracker(ttk.Frame):
             messagebox.showerror("Error", "Prices must be valid numbers.")
             return
 
+        if source < 0 or sold < 0:
+            messagebox.showerror("Error", "Prices cannot be negative.")
+            return
+
         if not date:
             messagebox.showerror("Error", "Date is required.")
             return
 
         try:
-            datetime.strptime(date, "%Y-%m-%d")
+            datetime.strptime(date, DATE_FORMAT)
         except ValueError:
             messagebox.showerror("Error", "Date must be in YYYY-MM-DD format.")
             return
 
-        # Add to database
-        self.db.insert_item(name, source, sold, date)
-        self.load_items()
+        # Add to database and jump to the top, where the new item is listed
+        if not self.db.insert_item(name, source, sold, date):
+            messagebox.showerror("Error", "Failed to add item. An identical item may already exist.")
+            return
+        if self.page_offset:
+            self.page_offset = 0
+            self.render_page()
         self.clear_form()
 
 
+    def import_items(self):
+        """Load a spreadsheet on a worker; chunks are committed as they are read"""
+        if self.import_task is not None:
+            return
+
+        path = filedialog.askopenfilename(
+            title="Import Items",
+            filetypes=[("Spreadsheets", "*.xlsx *.xlsm *.csv"), ("All files", "*.*")]
+        )
+        if not path:
+            return
+
+        def show_progress(fraction, message):
+            self.import_status.config(text=message)
+
+        def finished(summary):
+            end_import()
+            self.show_import_summary(summary)
+
+        def failed(error):
+            end_import()
+            messagebox.showerror("Import Failed", str(error))
+
+        def end_import():
+            self.import_task = None
+            self.import_btn.config(state="normal")
+            self.import_status.config(text="")
+            # The worker's writes notify nobody; views reload here, on the Tk thread
+            self.db.publish("inserted")
+
+        self.import_btn.config(state="disabled")
+        # No owner, so switching tabs does not cancel the import
+        self.import_task = self.tasks.submit_job(
+            self.read_items, path,
+            on_done=finished, on_error=failed, on_progress=show_progress
+        )
+
+    def read_items(self, task, path):
+        """Worker: import path, stopping before the next chunk is written once the task is cancelled"""
+        def progress(summary):
+            task.report(0.0, f"Imported {summary['inserted']:,} of {summary['read']:,} rows "
+                             f"({summary['rows_per_second']:,.0f} rows/s)")
+
+        with self.db.worker_session() as db:
+            return ItemImporter(db).run(path, progress=progress, before_write=task.check_cancelled)
+
+    @staticmethod
+    def show_import_summary(summary):
+        message = (f"Imported {summary['inserted']:,} items in {summary['elapsed']:.1f}s "
+                   f"({summary['rows_per_second']:,.0f} rows/s).\n"
+                   f"Skipped {summary['duplicates']:,} duplicates and {summary['invalid']:,} invalid rows.")
+        if summary["errors"]:
+            message += "\n\n" + "\n".join(summary["errors"][:10])
+        messagebox.showinfo("Import Complete", message)
+
+    def export_items(self):
+        """Stream every item to a CSV or Parquet file on a worker"""
+        if self.export_task is not None:
+            return
+
+        path = filedialog.asksaveasfilename(
+            title="Export Items",
+            defaultextension=".csv",
+            initialfile=f"Items_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+            filetypes=[("CSV", "*.csv"), ("Parquet", "*.parquet")]
+        )
+        if not path:
+            return
+
+        def show_progress(fraction, message):
+            self.import_status.config(text=f"{message} {fraction:.0%}")
+
+        def finished(summary):
+            self.export_task = None
+            self.export_btn.config(state="normal")
+            self.import_status.config(text="")
+            messagebox.showinfo("Export Complete",
+                                f"Exported {summary['rows']:,} items in {summary['elapsed']:.1f}s.")
+
+        def failed(error):
+            self.export_task = None
+            self.export_btn.config(state="normal")
+            self.import_status.config(text="")
+            messagebox.showerror("Export Failed", str(error))
+
+        self.export_btn.config(state="disabled")
+        # Like the import, kept running when the tab is hidden
+        self.export_task = self.tasks.submit_job(
+            self.write_items, path,
+            on_done=finished, on_error=failed, on_progress=show_progress
+        )
+
+    def write_items(self, task, path):
+        """Worker: export all items to path"""
+        with self.db.worker_session() as db:
+            return ItemExporter(db).run(path, progress=lambda summary: task.report(
+                summary["rows"] / max(summary["expected"], summary["rows"], 1),
+                f"Exported {summary['rows']:,} rows ({summary['rows_per_second']:,.0f} rows/s)"
+            ))
+
     def clear_form(self):
         self.name_var.set("")
         self.source_var.set("")
@@ -434,138 +647,168 @@ class ItemTracker(ttk.Frame):
         self.date_var.set(datetime.today().strftime("%Y-%m-%d"))
 
     def load_items(self):
-        # Clear existing items
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+        # Totals and the visible page are read on a worker thread, then drawn here
+        if self.load_task is not None:
+            self.load_task.cancel()
+        self.load_task = self.tasks.submit(
+            self.fetch_page_data, self.page_offset, self.page_size,
+            on_done=self.show_page_data, owner=self
+        )
 
-        # Load data from database
-        data = self.db.fetch_items()
+    def fetch_page_data(self, offset, limit):
+        """Worker: (totals, clamped offset, rows) for one page of the list"""
+        with self.db.worker_session() as db:
+            # Total row count comes from the rollup table, not a scan
+            totals = db.fetch_totals()
+            offset = min(max(0, offset), max(0, totals["item_count"] - limit))
+            return totals, offset, db.fetch_items_page(offset, limit)
 
-        for row in data:
-            name, source, sold, date = row
-            profit = sold - source if sold > 0 else 0
-            status = "Sold" if sold > 0 else "Unsold"
+    def show_page_data(self, result):
+        totals, offset, rows = result
+        self.total_rows = totals["item_count"]
+        self.page_offset = offset
+        self.render_page(rows)
+
+        # Update stats
+        self.refresh_stats(totals)
 
-            # Color coding based on status
-            values = (name, f"₱{source:.2f}", f"₱{sold:.2f}" if sold > 0 else "-",
-                      date, f"₱{profit:.2f}" if profit != 0 else "-", status)
+    def render_page(self, data=None):
+        """Show the window of rows starting at page_offset, fetching it unless given"""
+        max_offset = max(0, self.total_rows - self.page_size)
+        self.page_offset = min(max(0, self.page_offset), max_offset)
+
+        self.tree.delete(*self.tree.get_children())
+
+        if data is None:
+            data = self.db.fetch_items_page(self.page_offset, self.page_size)
+        self.items_by_id = {row[0]: row for row in data}
+
+        for row in data:
+            self.tree.insert("", "end", iid=str(row[0]), values=self.row_values(row))
+
+        # Reselect the rows of this page that were selected before
+        visible = [str(item_id) for item_id in self.selected_ids if item_id in self.items_by_id]
+        if visible:
+            self.tree.selection_set(visible)
+
+        self.update_scrollbar()
+
+    @staticmethod
+    def row_values(row):
+        _, name, source, sold, date, status, sold_date = row
+        # Sold items are listed under their sale date
+        if status == "sold":
+            profit = sold - source
+            return (name, f"₱{source:.2f}", f"₱{sold:.2f}", sold_date,
+                    f"₱{profit:.2f}" if profit != 0 else "-", "✅ Sold")
+        return (name, f"₱{source:.2f}", "-", date, "-", "📦 Unsold")
+
+    def update_scrollbar(self):
+        if self.total_rows:
+            shown = len(self.tree.get_children())
+            self.v_scrollbar.set(self.page_offset / self.total_rows,
+                                 (self.page_offset + shown) / self.total_rows)
+        else:
+            self.v_scrollbar.set(0, 1)
 
-            item_id = self.tree.insert("", "end", values=values)
+    def apply_change(self, change):
+        """Data change listener: patch the visible page and stats instead of reloading"""
+        if change.ids is None:
+            self.load_items()
+            return
 
-            # Add tags for styling
-            if status == "Sold":
-                self.tree.set(item_id, "Status", "✅ Sold")
+        # All-time totals are a single maintained row, so this read is constant time
+        totals = self.db.fetch_totals()
+        self.refresh_stats(totals)
+        self.total_rows = totals["item_count"]
+
+        if change.kind == "updated":
+            for row in self.db.fetch_items_by_id(i for i in change.ids if i in self.items_by_id):
+                self.items_by_id[row[0]] = row
+                self.tree.item(str(row[0]), values=self.row_values(row))
+        elif change.kind == "inserted":
+            if self.page_offset:
+                # New items are listed first; keep the rows in view where they are
+                self.page_offset += len(change.ids)
             else:
-                self.tree.set(item_id, "Status", "📦 Unsold")
+                for index, row in enumerate(self.db.fetch_items_by_id(change.ids)):
+                    self.items_by_id[row[0]] = row
+                    self.tree.insert("", index, iid=str(row[0]), values=self.row_values(row))
+                for iid in self.tree.get_children()[self.page_size:]:
+                    self.items_by_id.pop(int(iid), None)
+                    self.tree.delete(iid)
+        else:
+            self.selected_ids.difference_update(change.ids)
+            # Rows below the deleted ones move up into the page
+            self.render_page()
+            return
 
-        # Update stats
-        self.refresh_stats()
+        self.update_scrollbar()
+
+    def scroll_rows(self, delta):
+        offset = self.page_offset
+        self.page_offset += delta
+        self.render_page()
+        return offset != self.page_offset
+
+    def on_virtual_scroll(self, *args):
+        """Scrollbar command: ('moveto', fraction) or ('scroll', n, 'units'|'pages')"""
+        if args[0] == "moveto":
+            self.page_offset = int(float(args[1]) * self.total_rows)
+            self.render_page()
+        elif args[0] == "scroll":
+            step = self.page_size if args[2] == "pages" else 1
+            self.scroll_rows(int(args[1]) * step)
+
+    def on_tree_mousewheel(self, event):
+        self.scroll_rows(-3 if event.delta > 0 else 3)
+        return "break"
+
+    def on_tree_arrow(self, event):
+        """Move past the edge of the window by paging in the next row"""
+        if not event.state & 0x0001:
+            # Without Shift the arrow keys replace the selection
+            self.forget_offpage_selection()
+        focus = self.tree.focus()
+        children = self.tree.get_children()
+        if not focus or not children:
+            return None
 
-    def refresh_stats(self):
-        """Helper method to refresh the stats card"""
-        try:
-            # Find and update stats card
-            for widget in self.winfo_children():
-                if isinstance(widget, ttk.Frame):
-                    for child in widget.winfo_children():
-                        if isinstance(child, ttk.Frame):
-                            for grandchild in child.winfo_children():
-                                if isinstance(grandchild, ttk.LabelFrame) and "Quick Stats" in str(
-                                        grandchild.cget("text")):
-                                    grandchild.destroy()
-                                    self.build_stats_card(child)
-                                    break
-        except:
-            pass  # Ignore if stats update fails
-
-
-# Enhanced Database Manager with update functionality
-class DatabaseManager:
-    def __init__(self, db_name="flippify.db"):
-        self.conn = sqlite3.connect(db_name, check_same_thread=False)
-        self.cursor = self.conn.cursor()
-        self.cursor.execute("""
-            CREATE TABLE IF NOT EXISTS items (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT,
-                source_price REAL,
-                sold_price REAL,
-                date TEXT
-            )
-        """)
-        self.conn.commit()
-
-    def insert_item(self, name, source_price, sold_price, date):
-        try:
-            self.cursor.execute(
-                "INSERT INTO items (name, source_price, sold_price, date) VALUES (?, ?, ?, ?)",
-                (name, source_price, sold_price, date)
-            )
-            self.conn.commit()
-            return True
-        except Exception as e:
-            print(f"Error inserting item: {e}")
-            return False
-
-    def fetch_items(self):
-        try:
-            self.cursor.execute("SELECT name, source_price, sold_price, date FROM items ORDER BY id DESC")
-            return self.cursor.fetchall()
-        except Exception as e:
-            print(f"Error fetching items: {e}")
-            return []
+        if event.keysym == "Up" and focus == children[0] and self.scroll_rows(-1):
+            target = self.tree.get_children()[0]
+        elif event.keysym == "Down" and focus == children[-1] and self.scroll_rows(1):
+            target = self.tree.get_children()[-1]
+        else:
+            return None
 
-    def update_item(self, old_name, old_source, old_sold, old_date, new_name, new_source, new_sold, new_date):
-        try:
-            # Find the specific item to update
-            self.cursor.execute(
-                "SELECT id FROM items WHERE name=? AND source_price=? AND sold_price=? AND date=? LIMIT 1",
-                (old_name, old_source, old_sold, old_date)
-            )
-            result = self.cursor.fetchone()
-
-            if result:
-                item_id = result[0]
-                self.cursor.execute(
-                    "UPDATE items SET name=?, source_price=?, sold_price=?, date=? WHERE id=?",
-                    (new_name, new_source, new_sold, new_date, item_id)
-                )
-                self.conn.commit()
-                return True
-            return False
-        except Exception as e:
-            print(f"Error updating item: {e}")
-            return False
-
-    def delete_item(self, name, source_price, sold_price, date):
-        try:
-            self.cursor.execute(
-                "SELECT id FROM items WHERE name=? AND source_price=? AND sold_price=? AND date=? LIMIT 1",
-                (name, source_price, sold_price, date)
-            )
-            result = self.cursor.fetchone()
-
-            if result:
-                item_id = result[0]
-                self.cursor.execute("DELETE FROM items WHERE id=?", (item_id,))
-                self.conn.commit()
-                return True
-            return False
-        except Exception as e:
-            print(f"Error deleting item: {e}")
-            return False
-
-    def delete_all_items(self):
+        self.tree.selection_set(target)
+        self.tree.focus(target)
+        return "break"
+
+    def on_tree_resize(self, event):
+        """Fit the page to the rows that actually fit in the widget"""
         try:
-            self.cursor.execute("DELETE FROM items")
-            self.conn.commit()
-            return True
-        except Exception as e:
-            print(f"Error deleting all items: {e}")
-            return False
-
-    def close(self):
-        self.conn.close()
+            row_height = int(ttk.Style().lookup("Treeview", "rowheight") or 20)
+        except (tk.TclError, ValueError):
+            row_height = 20
+        # Leave room for the heading row
+        page_size = max(1, (event.height - row_height - 5) // row_height)
+        if page_size != self.page_size:
+            self.page_size = page_size
+            self.render_page()
+
+    def refresh_stats(self, totals):
+        """Helper method to refresh the stats card"""
+        total_items = totals["item_count"]
+        sold_items = totals["sold_count"]
+        unsold_items = total_items - sold_items
+        total_profit = totals["profit"]
+
+        stats_text = f"📊 Total Items: {total_items}\n"
+        stats_text += f"✅ Sold: {sold_items}\n"
+        stats_text += f"📦 Unsold: {unsold_items}\n"
+        stats_text += f"💰 Total Profit: ₱{total_profit:.2f}"
+        self.stats_label.config(text=stats_text)
 
 
 # Example usage
@@ -1,15 +1,21 @@
+import time
+_STARTED = time.perf_counter()  # before the other imports, so the startup report counts them
+
 import tkinter as tk
 from tkinter import ttk
 import sv_ttk
 import os
+import sys
 from item_tracker import ItemTracker
-from analytics_dashboard import AnalyticsDashboard
 from inventory import InventoryTab
+from database import DatabaseManager
+from tasks import TaskExecutor
+from startup import StartupTimer
 
 
 
 class FlippifyApp(tk.Tk):
-    def __init__(self):
+    def __init__(self, startup_timer=None):
         super().__init__()
         self.title("Flippify")
         self.center_window(1200, 700)
@@ -21,6 +27,14 @@ class FlippifyApp(tk.Tk):
 
 
         self.last_geometry = "1200x700+100+100"
+        self.is_fullscreen = False
+
+        # One database manager for the whole app, shared by every tab
+        self.db = DatabaseManager()
+
+        # Background workers for queries and chart building
+        self.tasks = TaskExecutor(self)
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
 
         self.setup_custom_titlebar()
 
@@ -51,8 +65,17 @@ class FlippifyApp(tk.Tk):
         
         self.current_frame = None
         self.active_button = None
+
+        # Tabs are built on first visit and then kept; stale ones reload when next shown
+        self.tabs = {}
+        self.stale_tabs = set()
+        self.db.subscribe(self.on_data_change)
         self.show_items()
 
+        if startup_timer is not None:
+            startup_timer.mark("window and first tab")
+            self.after_idle(lambda: (startup_timer.mark("first draw"), startup_timer.report()))
+
     def center_window(self, width, height):
         screen_width = self.winfo_screenwidth()
         screen_height = self.winfo_screenheight()
@@ -104,7 +127,7 @@ class FlippifyApp(tk.Tk):
             bd=0,
             padx=10,
             pady=2,
-            command=self.quit,
+            command=self.on_close,
             activebackground='#e74c3c'
         )
         close_btn.pack(side="left", padx=2)
@@ -142,6 +165,14 @@ class FlippifyApp(tk.Tk):
             self.geometry(f"{self.winfo_screenwidth()}x{self.winfo_screenheight()}+0+0")
 
 
+    def on_close(self):
+        """Stop background work and close the shared database before exiting"""
+        # Running jobs stop at their next check_cancelled; wait for them so
+        # none is left writing to the database once it is closed
+        self.tasks.shutdown(wait=True)
+        self.db.close()
+        self.destroy()
+
     def setup_sidebar(self):
         self.sidebar = tk.Frame(self.main_container, bg='#181818', width=220)
         self.sidebar.pack(side="left", fill="y")
@@ -222,41 +253,62 @@ class FlippifyApp(tk.Tk):
         self.content = ttk.Frame(self.content_container)
         self.content.pack(fill="both", expand=True, padx=30, pady=20)
 
-    def clear_frame(self):
-        if self.current_frame:
-            self.current_frame.destroy()
+    def show_tab(self, name, index, create, refresh):
+        """Show a tab, building it on first visit and reloading it only when its data is stale.
+
+        Tabs stay alive while hidden, so switching back to one costs nothing
+        unless on_data_change has marked it stale since it loaded. Loads still
+        running for the tab being hidden are cancelled, and that tab is marked
+        stale so it reloads when shown again.
+        """
+        if self.current_frame is not None and self.current_frame is not self.tabs.get(name):
+            hidden = next(key for key, frame in self.tabs.items() if frame is self.current_frame)
+            if self.tasks.cancel(owner=self.current_frame):
+                self.stale_tabs.add(hidden)
+
+        tab = self.tabs.get(name)
+        if tab is None:
+            tab = create(self.content, self.db, self.tasks)
+            self.tabs[name] = tab
+        elif name in self.stale_tabs:
+            refresh(tab)
+        self.stale_tabs.discard(name)
+
+        if self.current_frame is not tab:
+            if self.current_frame:
+                self.current_frame.pack_forget()
+            tab.pack(fill="both", expand=True)
+            self.current_frame = tab
 
-    def show_items(self):
-        self.clear_frame()
-        self.current_frame = ItemTracker(self.content)
-        self.current_frame.pack(fill="both", expand=True)
         if self.nav_buttons:
-            self.set_active_button(self.nav_buttons[0])
+            self.set_active_button(self.nav_buttons[index])
+
+    def on_data_change(self, change):
+        """Tabs with an apply_change listener patch themselves; the rest reload on their next visit"""
+        for name, tab in self.tabs.items():
+            if not hasattr(tab, "apply_change"):
+                self.stale_tabs.add(name)
+
+    def show_items(self):
+        self.show_tab("items", 0, ItemTracker, ItemTracker.load_items)
 
     def show_analytics(self):
-        self.clear_frame()
-        self.current_frame = AnalyticsDashboard(self.content)
-        self.current_frame.pack(fill="both", expand=True)
-        if self.nav_buttons:
-            self.set_active_button(self.nav_buttons[1])
+        # matplotlib and numpy load with the dashboard, not at startup
+        from analytics_dashboard import AnalyticsDashboard
+        self.show_tab("analytics", 1, AnalyticsDashboard, AnalyticsDashboard.refresh_dashboard)
 
     def show_inventory(self):
-        self.clear_frame()
-        self.current_frame = InventoryTab(self.content)
-        self.current_frame.pack(fill="both", expand=True)
-        if self.nav_buttons:
-            self.set_active_button(self.nav_buttons[2])
+        self.show_tab("inventory", 2, InventoryTab, InventoryTab.build_inventory_list)
 
     def show_profit_report(self):
-        self.clear_frame()
         from profit_report import ProfitReportTab
-        self.current_frame = ProfitReportTab(self.content)
-        self.current_frame.pack(fill="both", expand=True)
-        if self.nav_buttons:
-            self.set_active_button(self.nav_buttons[3])  # Adjust index if needed
-
+        self.show_tab("profit_report", 3, ProfitReportTab, ProfitReportTab.update_report)
 
 
 if __name__ == "__main__":
-    app = FlippifyApp()
+    # python main.py --startup-report prints how long each startup phase took
+    timer = StartupTimer(_STARTED) if "--startup-report" in sys.argv[1:] else None
+    if timer is not None:
+        timer.mark("imports")
+    app = FlippifyApp(timer)
     app.mainloop()
\ No newline at end of file
@@ -1,21 +1,61 @@
 import tkinter as tk
-from tkinter import ttk, messagebox
-from datetime import datetime, timedelta
+from tkinter import ttk, messagebox, filedialog
+from datetime import datetime
 from database import DatabaseManager
-from docx import Document
-from docx.shared import Inches
-from docx.enum.text import WD_ALIGN_PARAGRAPH
-import matplotlib.pyplot as plt
+from tasks import TaskExecutor
+from exporter import ItemExporter, write_atomic_all
+import analytics
+from xml.sax.saxutils import escape
+import csv
 import io
 import os
 
 
+# Reports with more sales than this list only the top sellers plus a monthly summary
+DETAIL_ROW_LIMIT = 2000
+SUMMARY_TOP_N = 50
+
+# Table rows parsed into the document per batch
+TABLE_CHUNK_SIZE = 500
+
+
+def add_table_rows(table, rows, task=None, progress=(0.0, 1.0)):
+    """Append rows of cell strings to a python-docx table in bulk.
+
+    table.add_row() copies and re-indexes the table for every row, which gets
+    slower as the table grows; building the row XML and parsing it in batches
+    keeps the cost linear. With a task, each batch checks for cancellation and
+    reports progress scaled into the (start, end) progress range.
+    """
+    from docx.oxml import parse_xml
+    from docx.oxml.ns import nsdecls
+
+    tbl = table._tbl
+    low, high = progress
+    for start in range(0, len(rows), TABLE_CHUNK_SIZE):
+        if task:
+            task.check_cancelled()
+            task.report(low + (high - low) * start / len(rows), f"Writing transactions... {start:,}/{len(rows):,}")
+        xml = "".join(
+            "<w:tr>" + "".join(
+                f'<w:tc><w:p><w:r><w:t xml:space="preserve">{escape(text)}</w:t></w:r></w:p></w:tc>'
+                for text in row
+            ) + "</w:tr>"
+            for row in rows[start:start + TABLE_CHUNK_SIZE]
+        )
+        for tr in list(parse_xml(f"<w:tbl {nsdecls('w')}>{xml}</w:tbl>")):
+            tbl.append(tr)
+
+
 class ProfitReportTab(ttk.Frame):
-    def __init__(self, parent):
+    def __init__(self, parent, db=None, tasks=None):
         super().__init__(parent)
-        self.db = DatabaseManager()
+        self.db = db if db is not None else DatabaseManager()
+        self.tasks = tasks if tasks is not None else TaskExecutor(self)
+        self.report_task = None
+        self.export_task = None
         self.setup_ui()
-        self.filtered_items = []
+        self.since_day = None
         self.update_report()
 
     def setup_ui(self):
@@ -30,13 +70,26 @@ class ProfitReportTab(ttk.Frame):
         ttk.Label(header_frame, text="📊 Profit Analytics",
                   font=("Segoe UI", 24, "bold")).pack(side="left")
 
-        export_btn = ttk.Button(header_frame, text="📄 Export Report",
-                                command=self.export_to_word, style="Accent.TButton")
-        export_btn.pack(side="right")
+        self.export_btn = ttk.Button(header_frame, text="📄 Export Report",
+                                     command=self.export_to_word, style="Accent.TButton")
+        self.export_btn.pack(side="right")
+
+        self.export_data_btn = ttk.Button(header_frame, text="💾 Export Data",
+                                          command=self.export_data)
+        self.export_data_btn.pack(side="right", padx=(0, 10))
+
+        # Export progress, shown only while a report is being written
+        self.export_frame = ttk.Frame(main_container)
+        self.export_status = ttk.Label(self.export_frame, text="", font=("Segoe UI", 9))
+        self.export_status.pack(side="left")
+        ttk.Button(self.export_frame, text="Cancel", command=self.cancel_export).pack(side="right")
+        self.export_progress = ttk.Progressbar(self.export_frame, mode="determinate", maximum=100)
+        self.export_progress.pack(side="right", fill="x", expand=True, padx=10)
 
         # Controls section
         controls_frame = ttk.LabelFrame(main_container, text="Report Configuration", padding=15)
         controls_frame.pack(fill="x", pady=(0, 20))
+        self.controls_frame = controls_frame
 
         # First row of controls
         row1 = ttk.Frame(controls_frame)
@@ -50,46 +103,42 @@ class ProfitReportTab(ttk.Frame):
         period_combo.pack(side="left", padx=(10, 30))
         period_combo.bind("<<ComboboxSelected>>", self.update_report)
 
+        # Export options
+        ttk.Label(row1, text="Detail rows:", font=("Segoe UI", 10)).pack(side="left")
+        self.detail_limit = tk.StringVar(value=str(DETAIL_ROW_LIMIT))
+        ttk.Spinbox(row1, from_=100, to=100000, increment=500,
+                    textvariable=self.detail_limit, width=8).pack(side="left", padx=(10, 30))
+
+        self.export_csv = tk.BooleanVar(value=False)
+        ttk.Checkbutton(row1, text="Save full list as CSV",
+                        variable=self.export_csv).pack(side="left")
+
         # Metrics display
         self.metrics_frame = ttk.LabelFrame(main_container, text="Key Metrics", padding=20)
         self.metrics_frame.pack(fill="both", expand=True)
 
     def update_report(self, event=None):
+        # Items dated after the start day; the rows themselves are only loaded for export
+        period = self.report_type.get()
+        self.since_day = analytics.period_start(period)
+
+        if self.report_task is not None:
+            self.report_task.cancel()
+        self.report_task = self.tasks.submit(
+            self.compute_metrics, period,
+            on_done=self.show_metrics, owner=self
+        )
+
+    def compute_metrics(self, period):
+        """Worker: the period's totals, read from the precomputed rollups"""
+        with self.db.worker_session() as db:
+            return analytics.period_summary(db, period)
+
+    def show_metrics(self, metrics):
         # Clear existing metrics
         for widget in self.metrics_frame.winfo_children():
             widget.destroy()
 
-        # Calculate date range
-        report_type = self.report_type.get()
-        current_date = datetime.now()
-
-        if report_type == "Week":
-            start_date = current_date - timedelta(days=7)
-        elif report_type == "Month":
-            start_date = current_date - timedelta(days=30)
-        elif report_type == "Year":
-            start_date = current_date - timedelta(days=365)
-        else:  # All
-            start_date = None
-
-        # Process data
-        self.filtered_items = []
-        metrics = {"cost": 0, "revenue": 0, "profit": 0, "count": 0}
-
-        for name, source, sold, date_str in self.db.fetch_items():
-            try:
-                if sold > 0:
-                    item_date = datetime.strptime(date_str, "%Y-%m-%d")
-                    # Include item if no date filter or within date range
-                    if start_date is None or item_date >= start_date:
-                        self.filtered_items.append((name, source, sold, date_str))
-                        metrics["cost"] += source
-                        metrics["revenue"] += sold
-                        metrics["profit"] += (sold - source)
-                        metrics["count"] += 1
-            except:
-                continue
-
         # Create metrics grid
         grid_frame = ttk.Frame(self.metrics_frame)
         grid_frame.pack(fill="both", expand=True)
@@ -117,20 +166,24 @@ class ProfitReportTab(ttk.Frame):
 
         # Add profit margin
         if metrics["revenue"] > 0:
-            margin = (metrics["profit"] / metrics["revenue"]) * 100
             margin_label = ttk.Label(self.metrics_frame,
-                                     text=f"📊 Profit Margin: {margin:.1f}%",
+                                     text=f"📊 Profit Margin: {metrics['margin']:.1f}%",
                                      font=("Segoe UI", 12, "bold"))
             margin_label.pack(pady=(20, 0))
 
-    def create_profit_chart(self):
-        """Create a profit breakdown chart"""
-        if not self.filtered_items:
+    def create_profit_chart(self, items):
+        """Create a profit breakdown chart.
+
+        Runs on a worker thread, so it draws on a standalone Figure; pyplot's
+        global state is not thread-safe.
+        """
+        if not items:
             return None
+        from matplotlib.figure import Figure
 
         # Aggregate data by date
         daily_profits = {}
-        for name, source, sold, date_str in self.filtered_items:
+        for name, source, sold, date_str in items:
             profit = sold - source
             if date_str in daily_profits:
                 daily_profits[date_str] += profit
@@ -138,31 +191,131 @@ class ProfitReportTab(ttk.Frame):
                 daily_profits[date_str] = profit
 
         # Create chart
-        plt.figure(figsize=(10, 6))
+        fig = Figure(figsize=(10, 6))
+        ax = fig.subplots()
         dates = list(daily_profits.keys())
         profits = list(daily_profits.values())
 
-        plt.bar(dates, profits, color='#2E86AB', alpha=0.8)
-        plt.title('Daily Profit Analysis', fontsize=16, fontweight='bold')
-        plt.xlabel('Date', fontsize=12)
-        plt.ylabel('Profit (₱)', fontsize=12)
-        plt.xticks(rotation=45)
-        plt.grid(axis='y', alpha=0.3)
-        plt.tight_layout()
+        ax.bar(dates, profits, color='#2E86AB', alpha=0.8)
+        ax.set_title('Daily Profit Analysis', fontsize=16, fontweight='bold')
+        ax.set_xlabel('Date', fontsize=12)
+        ax.set_ylabel('Profit (₱)', fontsize=12)
+        ax.tick_params(axis='x', rotation=45)
+        ax.grid(axis='y', alpha=0.3)
+        fig.tight_layout()
 
         # Save to bytes
         img_buffer = io.BytesIO()
-        plt.savefig(img_buffer, format='png', dpi=300, bbox_inches='tight')
+        fig.savefig(img_buffer, format='png', dpi=300, bbox_inches='tight')
         img_buffer.seek(0)
-        plt.close()
 
         return img_buffer
 
     def export_to_word(self):
-        if not self.filtered_items:
-            messagebox.showwarning("No Data", "No data available for export.")
+        """Build the Word report on a worker while a progress bar tracks it"""
+        if self.export_task is not None:
             return
 
+        filename = f"Profit_Report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.docx"
+        try:
+            detail_limit = max(1, int(self.detail_limit.get()))
+        except ValueError:
+            detail_limit = DETAIL_ROW_LIMIT
+
+        self.start_export(
+            "Preparing report...", self.build_word_report,
+            self.since_day, self.report_type.get(), os.path.abspath(filename),
+            detail_limit, self.export_csv.get()
+        )
+
+    def export_data(self):
+        """Stream the sales behind the current report to a CSV or Parquet file"""
+        if self.export_task is not None:
+            return
+
+        path = filedialog.asksaveasfilename(
+            title="Export Sales Data",
+            defaultextension=".csv",
+            initialfile=f"Sales_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+            filetypes=[("CSV", "*.csv"), ("Parquet", "*.parquet")]
+        )
+        if not path:
+            return
+        self.start_export("Exporting sales...", self.write_sales_data, self.since_day, path)
+
+    def write_sales_data(self, task, since_day, path):
+        """Worker: export the report's sales and return the file name, or None if there were none"""
+        def show_progress(summary):
+            task.check_cancelled()
+            task.report(summary["rows"] / max(summary["expected"], summary["rows"], 1),
+                        f"Exported {summary['rows']:,} rows ({summary['rows_per_second']:,.0f} rows/s)...")
+
+        with self.db.worker_session() as db:
+            summary = ItemExporter(db).run(path, sold_only=True, since=since_day, progress=show_progress)
+        return path if summary["rows"] else None
+
+    def start_export(self, message, job, *args):
+        for button in (self.export_btn, self.export_data_btn):
+            button.config(state="disabled")
+        self.export_progress["value"] = 0
+        self.export_status.config(text=message)
+        self.export_frame.pack(fill="x", pady=(0, 20), before=self.controls_frame)
+
+        # Not owned by the tab, so the export survives a switch to another tab
+        self.export_task = self.tasks.submit_job(
+            job, *args,
+            on_done=self.export_finished, on_error=self.export_failed,
+            on_progress=self.show_export_progress, on_cancel=self.end_export
+        )
+
+    def cancel_export(self):
+        # The buttons come back from on_cancel, once the worker has stopped writing
+        if self.export_task is not None and not self.export_task.cancelled:
+            self.export_task.cancel()
+            self.export_status.config(text="Cancelling...")
+
+    def show_export_progress(self, fraction, message):
+        self.export_progress["value"] = fraction * 100
+        self.export_status.config(text=message)
+
+    def end_export(self):
+        self.export_task = None
+        self.export_frame.pack_forget()
+        for button in (self.export_btn, self.export_data_btn):
+            button.config(state="normal")
+
+    def export_finished(self, filename):
+        self.end_export()
+        if filename is None:
+            messagebox.showwarning("No Data", "No data available for export.")
+        else:
+            messagebox.showinfo("Success", f"Exported: {os.path.basename(filename)}")
+
+    def export_failed(self, error):
+        self.end_export()
+        messagebox.showerror("Export Failed", f"Could not export: {error}")
+
+    def build_word_report(self, task, since_day, period, filename, detail_limit=DETAIL_ROW_LIMIT, with_csv=False):
+        """Worker: write the report to filename and return it, or None if there is no data.
+
+        Past detail_limit sales the transaction table is replaced by the top
+        sellers and a per-month summary. with_csv also writes every sale to a
+        CSV next to the report. Both files are written to temporary names in
+        the same folder and renamed only once both are complete, so a
+        cancelled or failed export leaves neither behind.
+        """
+        task.report(0.0, "Loading sales...")
+        with self.db.worker_session() as db:
+            items = db.fetch_sold_items(since=since_day)
+        if not items:
+            return None
+        task.check_cancelled()
+
+        # python-docx is only loaded once a report is actually exported
+        from docx import Document
+        from docx.shared import Inches
+        from docx.enum.text import WD_ALIGN_PARAGRAPH
+
         doc = Document()
 
         # Header
@@ -171,51 +324,103 @@ class ProfitReportTab(ttk.Frame):
 
         # Metadata
         meta_p = doc.add_paragraph()
-        meta_p.add_run(f"Period: {self.report_type.get()} | Generated: {datetime.now().strftime('%B %d, %Y')}")
+        meta_p.add_run(f"Period: {period} | Generated: {datetime.now().strftime('%B %d, %Y')}")
 
         # Calculate totals
         totals = {
-            'cost': sum(source for _, source, _, _ in self.filtered_items),
-            'revenue': sum(sold for _, _, sold, _ in self.filtered_items),
+            'cost': sum(source for _, source, _, _ in items),
+            'revenue': sum(sold for _, _, sold, _ in items),
         }
         totals['profit'] = totals['revenue'] - totals['cost']
-        totals['margin'] = (totals['profit'] / totals['revenue'] * 100) if totals['revenue'] > 0 else 0
+        totals['margin'] = analytics.margin(totals['profit'], totals['revenue'])
 
         # Summary section
         summary = doc.add_paragraph()
         summary.add_run("EXECUTIVE SUMMARY\n").bold = True
-        summary.add_run(f"Items Sold: {len(self.filtered_items)} | ")
+        summary.add_run(f"Items Sold: {len(items)} | ")
         summary.add_run(f"Revenue: ₱{totals['revenue']:,.2f} | ")
         summary.add_run(f"Profit: ₱{totals['profit']:,.2f} | ")
         summary.add_run(f"Margin: {totals['margin']:.1f}%")
 
         # Add chart
-        chart_buffer = self.create_profit_chart()
+        task.report(0.05, "Drawing chart...")
+        chart_buffer = self.create_profit_chart(items)
         if chart_buffer:
             doc.add_paragraph("\nPROFIT TREND ANALYSIS").bold = True
             chart_para = doc.add_paragraph()
             run = chart_para.runs[0] if chart_para.runs else chart_para.add_run()
             run.add_picture(chart_buffer, width=Inches(6))
+        task.check_cancelled()
+
+        csv_name = os.path.splitext(filename)[0] + ".csv" if with_csv else None
 
         # Transaction table
-        doc.add_paragraph("\nDETAILED TRANSACTIONS").bold = True
-        table = doc.add_table(rows=1, cols=5)
+        task.report(0.25, "Writing transactions...")
+        if len(items) > detail_limit:
+            self.add_summary_tables(doc, items, csv_name)
+        else:
+            doc.add_paragraph("\nDETAILED TRANSACTIONS").bold = True
+            self.add_table(doc, ['Item', 'Cost', 'Revenue', 'Profit', 'Date'], [
+                (name, f"₱{source:,.2f}", f"₱{sold:,.2f}", f"₱{sold - source:,.2f}", date)
+                for name, source, sold, date in items
+            ], task, (0.25, 0.6 if csv_name else 0.8))
+        task.check_cancelled()
+
+        def save_csv(path):
+            task.report(0.6, "Writing CSV...")
+            self.write_items_csv(path, items)
+            task.check_cancelled()
+
+        def save_doc(path):
+            task.report(0.8, "Saving document...")
+            doc.save(path)
+
+        # A cancel before both are saved discards the temp files instead of replacing
+        files = [(csv_name, save_csv, ".csv.tmp")] if csv_name else []
+        write_atomic_all(files + [(filename, save_doc, ".docx.tmp")], task.check_cancelled)
+        task.report(1.0, "Done")
+        return filename
+
+    @staticmethod
+    def add_table(doc, headers, rows, task=None, progress=(0.0, 1.0)):
+        table = doc.add_table(rows=1, cols=len(headers))
         table.style = 'Light Grid Accent 1'
-
-        headers = ['Item', 'Cost', 'Revenue', 'Profit', 'Date']
         for i, header in enumerate(headers):
             table.rows[0].cells[i].text = header
-
-        for name, source, sold, date in self.filtered_items:
-            row = table.add_row()
-            cells = row.cells
-            cells[0].text = name
-            cells[1].text = f"₱{source:,.2f}"
-            cells[2].text = f"₱{sold:,.2f}"
-            cells[3].text = f"₱{sold - source:,.2f}"
-            cells[4].text = date
-
-        # Save
-        filename = f"Profit_Report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.docx"
-        doc.save(filename)
-        messagebox.showinfo("Success", f"Report exported: {filename}")
\ No newline at end of file
+        add_table_rows(table, rows, task, progress)
+        return table
+
+    def add_summary_tables(self, doc, items, csv_name):
+        """Top sellers by profit plus a per-month roll-up, for reports too large to list in full"""
+        note = f"{len(items):,} transactions; showing the top {min(SUMMARY_TOP_N, len(items))} by profit."
+        if csv_name:
+            note += f" The full list is in {os.path.basename(csv_name)}."
+
+        doc.add_paragraph("\nTOP TRANSACTIONS").bold = True
+        doc.add_paragraph(note)
+        top = sorted(items, key=lambda item: item[2] - item[1], reverse=True)[:SUMMARY_TOP_N]
+        self.add_table(doc, ['Item', 'Cost', 'Revenue', 'Profit', 'Date'], [
+            (name, f"₱{source:,.2f}", f"₱{sold:,.2f}", f"₱{sold - source:,.2f}", date)
+            for name, source, sold, date in top
+        ])
+
+        months = {}
+        for name, source, sold, date in items:
+            month = months.setdefault(date[:7], [0, 0.0, 0.0])
+            month[0] += 1
+            month[1] += source
+            month[2] += sold
+
+        doc.add_paragraph("\nMONTHLY SUMMARY").bold = True
+        self.add_table(doc, ['Month', 'Items', 'Cost', 'Revenue', 'Profit'], [
+            (month, f"{count:,}", f"₱{cost:,.2f}", f"₱{revenue:,.2f}", f"₱{revenue - cost:,.2f}")
+            for month, (count, cost, revenue) in sorted(months.items())
+        ])
+
+    @staticmethod
+    def write_items_csv(path, items):
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["name", "source_price", "sold_price", "profit", "date"])
+            writer.writerows((name, source, sold, round(sold - source, 2), date)
+                             for name, source, sold, date in items)
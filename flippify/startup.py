@@ -0,0 +1,32 @@
+import sys
+import time
+
+
+# Dependencies that should only load once a feature needs them
+HEAVY_MODULES = ("matplotlib", "numpy", "docx", "openpyxl", "pyarrow")
+
+
+class StartupTimer:
+    """Record the phases of app startup and print how long each took"""
+
+    def __init__(self, start=None):
+        self.start = start if start is not None else time.perf_counter()
+        self.phases = []
+        self._last = self.start
+
+    def mark(self, label):
+        """End the current phase under label"""
+        now = time.perf_counter()
+        self.phases.append((label, now - self._last))
+        self._last = now
+
+    def report(self, out=None):
+        out = out or sys.stderr
+        print("Startup timing:", file=out)
+        for label, seconds in self.phases:
+            print(f"  {label:<22}{seconds * 1000:9.1f} ms", file=out)
+        print(f"  {'total':<22}{(self._last - self.start) * 1000:9.1f} ms", file=out)
+
+        loaded = [name for name in HEAVY_MODULES if name in sys.modules]
+        print(f"  heavy modules loaded: {', '.join(loaded) or 'none'}", file=out)
+        print("  for a per-module breakdown run: python -X importtime main.py", file=out)
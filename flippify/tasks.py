@@ -0,0 +1,142 @@
+import queue
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+
+class TaskCancelled(Exception):
+    """Raised inside a job when its task has been cancelled"""
+
+
+class Task:
+    """Handle for submitted work; cancelling it drops the result"""
+
+    def __init__(self, owner=None, results=None):
+        self.owner = owner
+        self.cancelled = False
+        self.future = None
+        self._results = results
+        self._on_progress = None
+        self._on_cancel = None
+
+    def cancel(self):
+        self.cancelled = True
+        if self.future is not None:
+            self.future.cancel()
+
+    def report(self, fraction, message=""):
+        """Called by a running job to publish progress (0.0-1.0) to the Tk thread"""
+        if self._on_progress is not None and not self.cancelled:
+            self._results.put((self, "progress", (fraction, message), self._on_progress))
+
+    def check_cancelled(self):
+        """Called by a running job at safe points to stop early once cancelled"""
+        if self.cancelled:
+            raise TaskCancelled()
+
+
+class TaskExecutor:
+    """Run work on a thread pool and hand the results back on the Tk thread.
+
+    Workers put finished results on a queue, which is polled with after()
+    so callbacks always run on the main thread and may touch widgets.
+    """
+
+    def __init__(self, widget, max_workers=2, poll_ms=30):
+        self.widget = widget
+        self.poll_ms = poll_ms
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="flippify-worker")
+        self._results = queue.Queue()
+        self._pending = set()
+        self._poll_id = None
+
+    def submit(self, func, *args, on_done=None, on_error=None, owner=None):
+        """Run func(*args) on a worker; on_done(result) is called on the Tk thread"""
+        return self._start(Task(owner, self._results), lambda: func(*args), on_done, on_error)
+
+    def submit_job(self, func, *args, on_done=None, on_error=None, on_progress=None, on_cancel=None, owner=None):
+        """Like submit, but calls func(task, *args) so a long job can report
+        progress through task.report() and honour task.check_cancelled().
+        on_cancel() is called on the Tk thread once a cancelled job has
+        actually stopped running.
+        """
+        task = Task(owner, self._results)
+        task._on_progress = on_progress
+        task._on_cancel = on_cancel
+        return self._start(task, lambda: func(task, *args), on_done, on_error)
+
+    def _start(self, task, call, on_done, on_error):
+        def run():
+            try:
+                task.check_cancelled()
+                result = call()
+            except TaskCancelled:
+                # Still reported so the poller stops tracking the task
+                self._results.put((task, "cancelled", None, None))
+            except Exception as e:
+                self._results.put((task, "error", e, on_error))
+            else:
+                self._results.put((task, "done", result, on_done))
+
+        self._pending.add(task)
+        task.future = self._pool.submit(run)
+        self._schedule_poll()
+        return task
+
+    def cancel(self, owner=None):
+        """Cancel every pending task, or only those submitted for owner; returns how many.
+
+        Cancelled tasks stay tracked until their worker stops, so on_cancel
+        callbacks run once it has.
+        """
+        cancelled = 0
+        for task in list(self._pending):
+            if (owner is None or task.owner is owner) and not task.cancelled:
+                task.cancel()
+                cancelled += 1
+        return cancelled
+
+    def _schedule_poll(self):
+        if self._poll_id is None:
+            self._poll_id = self.widget.after(self.poll_ms, self._poll)
+
+    def _poll(self):
+        self._poll_id = None
+        while True:
+            try:
+                task, kind, payload, callback = self._results.get_nowait()
+            except queue.Empty:
+                break
+
+            if kind == "progress":
+                if not task.cancelled:
+                    callback(*payload)
+                continue
+
+            self._pending.discard(task)
+            if task.cancelled:
+                if task._on_cancel:
+                    task._on_cancel()
+                continue
+            if kind == "error":
+                if callback:
+                    callback(payload)
+                else:
+                    traceback.print_exception(type(payload), payload, payload.__traceback__)
+            elif callback:
+                callback(payload)
+
+        # Drop tasks whose futures were cancelled before they started
+        for task in [task for task in self._pending if task.future.cancelled()]:
+            self._pending.discard(task)
+            if task._on_cancel:
+                task._on_cancel()
+        if self._pending:
+            self._schedule_poll()
+
+    def shutdown(self, wait=False):
+        """Cancel every task; with wait, block until running jobs have stopped"""
+        self.cancel()
+        if self._poll_id is not None:
+            self.widget.after_cancel(self._poll_id)
+            self._poll_id = None
+        self._pool.shutdown(wait=wait)